@@ -5,7 +5,7 @@ from pg_gen.world.Actor import Actor
 
 from ..difficulty.DifficultyProvider import DifficultyProvider
 from ..difficulty.DifficultyReport import DifficultyReport
-from ..game_core.Camera import CameraClient
+from ..game_core.CameraClient import CameraClient
 from ..generation.RoomParameter import RoomParameter
 from ..level_editor.ActorRegistry import ActorRegistry
 from ..support.Color import Color
@@ -1,7 +1,7 @@
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Literal, override
 
-from ..game_core.Camera import Camera, CameraClient
+from ..game_core.CameraClient import CameraClient
 from ..game_core.ResourceClient import ResourceClient
 from ..generation.RoomInfo import ALTAR, NO_KEY, NOT_CONNECTED
 from ..level_editor.ActorRegistry import ActorRegistry
@@ -16,10 +16,11 @@ from .progression.Key import Key
 from .Wall import Wall
 
 if TYPE_CHECKING:
+    from ..game_core.Camera import Camera
     from ..generation.RoomInstantiationContext import RoomInstantiationContext
 
 
-def _draw_direction(camera: Camera, position: Point, size: Point, direction: Direction):
+def _draw_direction(camera: "Camera", position: Point, size: Point, direction: Direction):
     center = position + size * 0.5
     vector = Point.from_direction(direction) * 0.1
     camera.draw_placeholder(center - vector, Point.ONE * 0.1, Color.WHITE)
@@ -3,9 +3,6 @@ from enum import Flag
 from math import copysign
 from typing import TYPE_CHECKING, Callable, override
 
-import pygame
-
-from ..game_core.GameLoop import GameLoop
 from ..game_core.InputClient import InputClient
 from ..support.Color import Color
 from ..support.support import find_index_by_predicate
@@ -45,6 +42,9 @@ class Player(InputClient, GuiRenderer, SpriteActor):
     score = 0
 
     def game_over(self):
+        # The game loop module depends on pygame, import it only when needed so the player can be imported without it
+        from ..game_core.GameLoop import GameLoop
+
         self.universe.di.inject(GameLoop).game_over()
 
     def respawn(self):
@@ -69,13 +69,9 @@ class Player(InputClient, GuiRenderer, SpriteActor):
         text = str(self.score).zfill(6)
         position = self._camera.world_to_screen(Point(12.5, 0.25))
         text_buffer, _ = self._resource_provider.display_font.render(text=text, fgcolor=TEXT_COLOR)
-        text_size = Point(*text_buffer.get_size())
         gradient_splits = 5
-        for y in range(gradient_splits):
-            color = Color.RED.mix(Color.YELLOW, 0.25 + (y / gradient_splits) * 0.5)
-            text_buffer.fill(color.to_pygame_color(), (text_size.down() * y / gradient_splits).to_pygame_rect(text_size * Point(1, 1 / gradient_splits)), pygame.BLEND_RGB_MULT)
-
-        self._camera.screen.blit(text_buffer, position.to_pygame_coordinates())
+        colors = [Color.RED.mix(Color.YELLOW, 0.25 + (y / gradient_splits) * 0.5) for y in range(gradient_splits)]
+        self._camera.draw_surface_bands(position, text_buffer, colors)
 
         return super().draw_gui()
 
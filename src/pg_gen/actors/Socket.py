@@ -1,9 +1,8 @@
 from copy import copy
 from dataclasses import dataclass, field
-from random import Random
 from typing import TYPE_CHECKING, Any, Literal, override
 
-from ..game_core.Camera import CameraClient
+from ..game_core.CameraClient import CameraClient
 from ..game_core.ResourceClient import ResourceClient
 from ..generation.RoomInfo import NO_KEY, NOT_CONNECTED
 from ..generation.RoomParameter import RoomParameter
@@ -13,6 +12,7 @@ from ..support.Color import Color
 from ..support.constants import TEXT_BG_COLOR, TEXT_COLOR
 from ..support.Direction import Direction
 from ..support.Point import Point
+from ..support.SplitMix import SplitMix
 from ..world.Actor import Actor
 from .Placeholders import Placeholder
 from .support.ConfigurableObject import ConfigurableObject
@@ -26,107 +26,178 @@ SocketCommandResult = ActorType | str | Literal[False]
 SocketState = SocketCommandResult | None
 
 
-@dataclass
-class _SocketCommand:
-    def get_value(self) -> SocketCommandResult: ...
+_ParameterComparison = Literal[None, "<", "=", ">"]
 
-    def evaluate(self, random: Random, context: "RoomInstantiationContext") -> SocketCommandResult:
-        return self.get_value()
+# Socket configs are compiled into a flat tuple of instructions. Conditional instructions continue with the next
+# instruction when they pass, otherwise they jump forward by their else offset. Every path ends with a result.
+_OP_RESULT = 0  # (op, value)
+_OP_CHANCE = 1  # (op, chance, else offset)
+_OP_PARAMETER = 2  # (op, parameter, comparison, threshold, else offset)
 
+type _Instruction = tuple[Any, ...]
+type SocketProgram = tuple[_Instruction, ...]
 
-@dataclass
-class _ActorCommand(_SocketCommand):
-    actor: ActorType
-    offset: Point
+_FAIL: SocketProgram = ((_OP_RESULT, False),)
 
-    @override
-    def get_value(self) -> SocketCommandResult:
-        if self.offset != Point.ZERO:
-            actor = copy(self.actor)
-            actor.offset = self.offset
-            return actor
-        return self.actor
 
+def _create_branch(condition: _Instruction, target: SocketProgram, fallback: SocketProgram | None) -> SocketProgram:
+    return ((*condition, len(target) + 1), *target, *(fallback or _FAIL))
 
-@dataclass
-class _RoomCommand(_SocketCommand):
-    room_name: str
 
-    @override
-    def get_value(self) -> SocketCommandResult:
-        return self.room_name
+def _compile_socket_config(config: str) -> SocketProgram | None:
+    arguments = config.split(",")
+    stack: list[SocketProgram] = []
 
+    if len(arguments) < 1:
+        return None
 
-@dataclass
-class _ChanceCommand(_SocketCommand):
-    chance: float
-    target: _SocketCommand
-    fallback: _SocketCommand | None
+    for argument in arguments:
+        if argument.startswith("@") and len(argument) > 1:
+            stack.append(((_OP_RESULT, argument[1:]),))
+            continue
 
-    @override
-    def evaluate(self, random: Random, context: "RoomInstantiationContext") -> SocketCommandResult:
-        if random.random() < self.chance:
-            return self.target.evaluate(random, context)
-        elif self.fallback is not None:
-            return self.fallback.evaluate(random, context)
-        else:
-            return False
+        if argument.endswith("%"):
+            use_fallback = False
+            if argument.startswith("?"):
+                use_fallback = True
+                argument = argument[1:]
 
-    @override
-    def get_value(self) -> ActorType | str | Literal[False]:
-        return self.target.get_value()
+            try:
+                chance = int(argument[0:-1]) / 100
+            except ValueError:
+                return None
 
+            if not use_fallback:
+                if len(stack) < 1:
+                    return None
+                stack.append(_create_branch((_OP_CHANCE, chance), stack.pop(), None))
+            else:
+                if len(stack) < 2:
+                    return None
+                fallback = stack.pop()
+                target = stack.pop()
+                stack.append(_create_branch((_OP_CHANCE, chance), target, fallback))
+
+            continue
+
+        if argument.startswith("$") or argument.startswith("?"):
+            use_fallback = argument.startswith("?")
+            argument = argument[1:]
+
+            comparison_index = next((i for i, c in enumerate(argument) if c in ["<", "=", ">"]), None)
+            comparison: _ParameterComparison = None
+            threshold_string = None
+            if comparison_index is not None:
+                comparison = argument[comparison_index]  # type: ignore
+                threshold_string = argument[comparison_index + 1 :]
+                argument = argument[0:comparison_index]
+
+            threshold = 0.0
+            if threshold_string is not None:
+                if threshold_string == "NC":
+                    threshold = NOT_CONNECTED
+                elif threshold_string == "NK":
+                    threshold = NO_KEY
+                else:
+                    try:
+                        threshold = float(threshold_string)
+                    except ValueError:
+                        return None
 
-_ParameterComparison = Literal[None, "<", "=", ">"]
+            parameter_name = argument.upper()
+            parameter: Direction | RoomParameter | Literal["key"]
+            if parameter_name in Direction._member_map_:
+                parameter = Direction[parameter_name]
+            elif parameter_name in RoomParameter._member_map_:
+                parameter = RoomParameter[parameter_name]
+            elif parameter_name == "KEY":
+                parameter = "key"
+            else:
+                return None
 
+            if not use_fallback:
+                if len(stack) < 1:
+                    return None
+                stack.append(_create_branch((_OP_PARAMETER, parameter, comparison, threshold), stack.pop(), None))
+            else:
+                if len(stack) < 2:
+                    return None
+                fallback = stack.pop()
+                target = stack.pop()
+                stack.append(_create_branch((_OP_PARAMETER, parameter, comparison, threshold), target, fallback))
+            continue
+
+        offset = Point.ZERO
+
+        if "^" in argument:
+            index = argument.index("^")
+            vertical_offset_string = argument[index + 1 :]
+            argument = argument[0:index]
+            try:
+                offset += Point(0, -float(vertical_offset_string))
+            except ValueError:
+                return None
 
-@dataclass
-class _ParameterCommand(_SocketCommand):
-    parameter: Direction | RoomParameter | Literal["key"]
-    comparison: _ParameterComparison
-    threshold: float
-    target: _SocketCommand
-    fallback: _SocketCommand | None
+        actor = ActorRegistry.try_find_actor_type(argument)
 
-    @override
-    def evaluate(self, random: Random, context: "RoomInstantiationContext") -> SocketCommandResult:
-        parameter: float
+        if actor is None:
+            return None
 
-        if isinstance(self.parameter, Direction):
-            parameter = context.get_connection(self.parameter)
-        elif isinstance(self.parameter, RoomParameter):
-            parameter = context.get_parameter(self.parameter)
-        else:
-            parameter = context.room.pickup_type
-
-        passes = False
-        if self.comparison is None:
-            passes = 1 if parameter == 1 else random.random() < parameter
-        elif self.comparison == "<":
-            passes = parameter < self.threshold
-        elif self.comparison == "=":
-            passes = parameter == self.threshold
-        else:
-            passes = parameter > self.threshold
+        if offset != Point.ZERO:
+            actor = copy(actor)
+            actor.offset = offset
 
-        if passes:
-            return self.target.evaluate(random, context)
-        elif self.fallback is not None:
-            return self.fallback.evaluate(random, context)
+        stack.append(((_OP_RESULT, actor),))
+
+    if len(stack) != 1:
+        return None
+    return stack[0]
+
+
+def _run_socket_program(program: SocketProgram, random: SplitMix, context: "RoomInstantiationContext") -> SocketCommandResult:
+    pc = 0
+
+    while True:
+        instruction = program[pc]
+        op = instruction[0]
+
+        if op == _OP_RESULT:
+            return instruction[1]
+
+        if op == _OP_CHANCE:
+            passes = random.random() < instruction[1]
         else:
-            return False
+            _, parameter_type, comparison, threshold, _ = instruction
+            parameter: float
 
-    @override
-    def get_value(self) -> ActorType | str | Literal[False]:
-        return self.target.get_value()
+            if isinstance(parameter_type, Direction):
+                parameter = context.get_connection(parameter_type)
+            elif isinstance(parameter_type, RoomParameter):
+                parameter = context.get_parameter(parameter_type)
+            else:
+                parameter = context.room.pickup_type
+
+            if comparison is None:
+                passes = parameter == 1 or random.random() < parameter
+            elif comparison == "<":
+                passes = parameter < threshold
+            elif comparison == "=":
+                passes = parameter == threshold
+            else:
+                passes = parameter > threshold
+
+        pc += 1 if passes else instruction[-1]
 
 
-_CONFIG_CACHE: dict[str, _SocketCommand | None] = {}
+def _get_socket_preview(program: SocketProgram) -> SocketCommandResult:
+    # Targets are laid out before their fallbacks, so the first result is what every condition passing gives
+    return next(instruction[1] for instruction in program if instruction[0] == _OP_RESULT)
 
 
 @dataclass(kw_only=True)
 class Socket(PersistentObject[SocketState], ResourceClient, CameraClient, ConfigurableObject, Placeholder):
     _actor_instance: Actor | None = field(default=None, init=False)
+    _program: SocketProgram | None = field(default=None, init=False, repr=False)
 
     @property
     def size_string(self):
@@ -140,132 +211,20 @@ class Socket(PersistentObject[SocketState], ResourceClient, CameraClient, Config
     def apply_config(self, config: str) -> bool:
         super().apply_config(config)
 
-        if self.parse_config() is None:
-            return False
-
-        return True
-
-    def parse_config(self):
-        cached = _CONFIG_CACHE.get(self.config, -1)
-        if cached != -1:
-            return cached
-
-        arguments = self.config.split(",")
-        stack: list[_SocketCommand] = []
-
-        _CONFIG_CACHE[self.config] = None
-
-        if len(arguments) < 1:
-            return None
-
-        for argument in arguments:
-            if argument.startswith("@") and len(argument) > 1:
-                stack.append(_RoomCommand(argument[1:]))
-                continue
-
-            if argument.endswith("%"):
-                use_fallback = False
-                if argument.startswith("?"):
-                    use_fallback = True
-                    argument = argument[1:]
-
-                try:
-                    chance = int(argument[0:-1]) / 100
-                except ValueError:
-                    return None
-
-                if not use_fallback:
-                    if len(stack) < 1:
-                        return None
-                    stack.append(_ChanceCommand(chance, stack.pop(), None))
-                else:
-                    if len(stack) < 2:
-                        return None
-                    fallback = stack.pop()
-                    target = stack.pop()
-                    stack.append(_ChanceCommand(chance, target, fallback))
-
-                continue
-
-            if argument.startswith("$") or argument.startswith("?"):
-                use_fallback = argument.startswith("?")
-                argument = argument[1:]
-
-                comparison_index = next((i for i, c in enumerate(argument) if c in ["<", "=", ">"]), None)
-                comparison: _ParameterComparison = None
-                threshold_string = None
-                if comparison_index is not None:
-                    comparison = argument[comparison_index]  # type: ignore
-                    threshold_string = argument[comparison_index + 1 :]
-                    argument = argument[0:comparison_index]
-
-                threshold = 0.0
-                if threshold_string is not None:
-                    if threshold_string == "NC":
-                        threshold = NOT_CONNECTED
-                    elif threshold_string == "NK":
-                        threshold = NO_KEY
-                    else:
-                        try:
-                            threshold = float(threshold_string)
-                        except ValueError:
-                            return None
-
-                parameter_name = argument.upper()
-                if parameter_name in Direction._member_map_:
-                    parameter = Direction[parameter_name]
-                elif parameter_name in RoomParameter._member_map_:
-                    parameter = RoomParameter[parameter_name]
-                elif parameter_name == "KEY":
-                    parameter = "key"
-                else:
-                    return None
-
-                if not use_fallback:
-                    if len(stack) < 1:
-                        return None
-                    stack.append(_ParameterCommand(parameter, comparison, threshold, stack.pop(), None))
-                else:
-                    if len(stack) < 2:
-                        return None
-                    fallback = stack.pop()
-                    target = stack.pop()
-                    stack.append(_ParameterCommand(parameter, comparison, threshold, target, fallback))
-                continue
-
-            offset = Point.ZERO
-
-            if "^" in argument:
-                index = argument.index("^")
-                vertical_offset_string = argument[index + 1 :]
-                argument = argument[0:index]
-                try:
-                    offset += Point(0, -float(vertical_offset_string))
-                except ValueError:
-                    return None
-
-            actor = ActorRegistry.try_find_actor_type(argument)
-
-            if actor is None:
-                return None
-            stack.append(_ActorCommand(actor, offset))
-
-        if len(stack) != 1:
-            return None
-        _CONFIG_CACHE[self.config] = stack[0]
-        return stack[0]
+        self._program = _compile_socket_config(config)
+        return self._program is not None
 
     @override
     def evaluate_placeholder(self, context: "RoomInstantiationContext"):
         state = self.persistent_value
         assert self.room is not None
 
-        command = self.parse_config()
-        if command is None:
+        program = self._program
+        if program is None:
             return False
 
         if state is None:
-            state = command.evaluate(Random(self.room.seed + self.flag_index), context)
+            state = _run_socket_program(program, SplitMix(self.room.seed + self.flag_index), context)
 
         self.persistent_value = state
 
@@ -276,7 +235,7 @@ class Socket(PersistentObject[SocketState], ResourceClient, CameraClient, Config
             return actor
         elif isinstance(state, str):
             rooms = RoomPrefabRegistry.find_rooms(state, requirements=None, context=context)
-            room = Random(context.room.seed + self.flag_index).choice(rooms)
+            room = SplitMix(context.room.seed + self.flag_index).choice(rooms)
 
             offset_context = context.create_child(offset=self.position)
             room.instantiate_using(offset_context)
@@ -294,10 +253,8 @@ class Socket(PersistentObject[SocketState], ResourceClient, CameraClient, Config
             bgcolor=TEXT_BG_COLOR,
         )
 
-        result = self.parse_config()
-
-        if result is not None:
-            state = result.get_value()
+        if self._program is not None:
+            state = _get_socket_preview(self._program)
             if isinstance(state, ActorType):
                 self._actor_instance = self._actor_instance or state.create_instance()
                 self._actor_instance.position = self.position
@@ -3,7 +3,7 @@ from typing import override
 
 from ...difficulty.DifficultyProvider import DifficultyProvider
 from ...difficulty.DifficultyReport import DifficultyReport
-from ...game_core.Camera import CameraClient
+from ...game_core.CameraClient import CameraClient
 from ...game_core.ResourceClient import ResourceClient
 from ...generation.RoomInfo import ALTAR, NO_KEY, RoomInfo
 from ...generation.RoomParameter import RoomParameter
@@ -4,7 +4,7 @@ from typing import override
 
 from pg_gen.generation.RoomInfo import RoomInfo
 
-from ...game_core.Camera import CameraClient
+from ...game_core.CameraClient import CameraClient
 from ...game_core.ResourceClient import ResourceClient
 from ...generation.RoomInfo import ALTAR
 from ...level_editor.ActorRegistry import ActorRegistry
@@ -1,7 +1,7 @@
 from dataclasses import dataclass, field
 from typing import override
 
-from ...game_core.Camera import CameraClient
+from ...game_core.CameraClient import CameraClient
 from ...game_core.ResourceClient import ResourceClient
 from ...support.Color import Color
 from ...world.SpriteLayer import SpriteLayer
@@ -12,6 +12,8 @@ class Assets:
     actors: Traversable
     spritesheet: Traversable
     font: Traversable
+    actor_manifest: Traversable
+    local: Traversable
 
 
 @cache
@@ -24,6 +26,8 @@ def get_pg_assets():
         actors=resources.joinpath("actors"),
         spritesheet=resources.joinpath("assets/spritesheet.png"),
         font=resources.joinpath("assets/Micro5/Micro5-Regular.ttf"),
+        actor_manifest=resources.joinpath("assets/actor_manifest.json"),
+        local=resources.joinpath("assets/.local"),
     )
 
 
@@ -0,0 +1,237 @@
+import json
+import os
+import tracemalloc
+from contextlib import redirect_stdout
+from dataclasses import dataclass, field
+from pathlib import Path
+from random import Random
+from statistics import median
+from time import perf_counter
+from typing import Any, Callable
+
+from ..difficulty.DifficultyOptimizer import DifficultyOptimizer
+from ..difficulty.DifficultyReport import DifficultyReport
+from ..difficulty.IslandOptimizer import IslandOptimizer
+from ..difficulty.LevelSolver import LevelSolver
+from ..difficulty.PathFinder import PathFinder
+from ..difficulty.SteadyStateOptimizer import SteadyStateOptimizer
+from ..game_core.Universe import Universe
+from ..generation.MapGenerator import GenerationStage, MapGenerator
+from ..generation.RoomParameter import UNUSED_PARAMETER, RoomParameter
+from .BenchmarkScenario import BenchmarkScenario
+
+BENCHMARK_VERSION = 2
+# Differences smaller than these are considered noise, even if the relative change is over the threshold
+_TIME_NOISE = 0.5e-3
+_MEMORY_NOISE = 64 * 1024
+_BLOCK_NOISE = 256
+
+type _Measure = Callable[[str, Callable[[], Any]], Any]
+
+
+@dataclass
+class StageResult:
+    median_time: float
+    min_time: float
+    peak_memory: int
+    net_memory: int
+    # Allocated blocks the stage left behind, many small objects can cost more than their size suggests
+    net_blocks: int
+
+    def serialize(self):
+        return {
+            "median_ms": self.median_time * 1000,
+            "min_ms": self.min_time * 1000,
+            "peak_kib": self.peak_memory / 1024,
+            "net_kib": self.net_memory / 1024,
+            "net_blocks": self.net_blocks,
+        }
+
+    @staticmethod
+    def deserialize(data: dict[str, Any]):
+        return StageResult(
+            median_time=data["median_ms"] / 1000,
+            min_time=data["min_ms"] / 1000,
+            peak_memory=int(data["peak_kib"] * 1024),
+            net_memory=int(data["net_kib"] * 1024),
+            net_blocks=data["net_blocks"],
+        )
+
+
+@dataclass
+class BenchmarkResults:
+    scenarios: dict[str, dict[str, StageResult]] = field(default_factory=lambda: {})
+
+    def save(self, path: Path):
+        data = {
+            "version": BENCHMARK_VERSION,
+            "scenarios": {name: {stage: result.serialize() for stage, result in stages.items()} for name, stages in self.scenarios.items()},
+        }
+        path.write_text(json.dumps(data, indent=4) + "\n")
+
+    @staticmethod
+    def load(path: Path):
+        data = json.loads(path.read_text())
+        if data.get("version") != BENCHMARK_VERSION:
+            raise ValueError(f"Benchmark baseline {path} has an unsupported version")
+
+        return BenchmarkResults({name: {stage: StageResult.deserialize(result) for stage, result in stages.items()} for name, stages in data["scenarios"].items()})
+
+    def print_table(self):
+        print(f"{"scenario":<16} {"stage":<22} {"median ms":>10} {"min ms":>10} {"peak KiB":>10} {"net KiB":>10} {"net blocks":>10}")
+        for name, stages in self.scenarios.items():
+            for stage, result in stages.items():
+                print(
+                    f"{name:<16} {stage:<22} {result.median_time * 1000:>10.2f} {result.min_time * 1000:>10.2f} "
+                    + f"{result.peak_memory / 1024:>10.1f} {result.net_memory / 1024:>10.1f} {result.net_blocks:>10}"
+                )
+
+    def compare(self, baseline: "BenchmarkResults", threshold: float):
+        regressions: list[str] = []
+
+        for name, stages in self.scenarios.items():
+            baseline_stages = baseline.scenarios.get(name)
+            if baseline_stages is None:
+                continue
+
+            for stage, result in stages.items():
+                previous = baseline_stages.get(stage)
+                if previous is None:
+                    continue
+
+                if result.median_time > previous.median_time * (1 + threshold) and result.median_time - previous.median_time > _TIME_NOISE:
+                    regressions.append(f"{name}/{stage}: time {previous.median_time * 1000:.2f} ms -> {result.median_time * 1000:.2f} ms")
+
+                if result.peak_memory > previous.peak_memory * (1 + threshold) and result.peak_memory - previous.peak_memory > _MEMORY_NOISE:
+                    regressions.append(f"{name}/{stage}: peak memory {previous.peak_memory / 1024:.1f} KiB -> {result.peak_memory / 1024:.1f} KiB")
+
+                if result.net_blocks > previous.net_blocks * (1 + threshold) and result.net_blocks - previous.net_blocks > _BLOCK_NOISE:
+                    regressions.append(f"{name}/{stage}: net blocks {previous.net_blocks} -> {result.net_blocks}")
+
+        return regressions
+
+
+class _TimingPass:
+    def __call__(self, name: str, function: Callable[[], Any]):
+        start = perf_counter()
+        result = function()
+        self.times.setdefault(name, []).append(perf_counter() - start)
+        return result
+
+    def __init__(self):
+        self.times: dict[str, list[float]] = {}
+        pass
+
+
+class _MemoryPass:
+    # The snapshots themselves are allocated by tracemalloc, they would otherwise show up as blocks of the stage
+    _SNAPSHOT_FILTERS = [tracemalloc.Filter(False, tracemalloc.__file__)]
+
+    def __call__(self, name: str, function: Callable[[], Any]):
+        snapshot = tracemalloc.take_snapshot().filter_traces(self._SNAPSHOT_FILTERS)
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+
+        result = function()
+
+        # Peak is the most memory the stage needed at once, net is what it left allocated after it finished
+        current, peak = tracemalloc.get_traced_memory()
+        differences = tracemalloc.take_snapshot().filter_traces(self._SNAPSHOT_FILTERS).compare_to(snapshot, "filename")
+        self.results[name] = (peak - before, current - before, sum(difference.count_diff for difference in differences))
+        return result
+
+    def __init__(self):
+        self.results: dict[str, tuple[int, int, int]] = {}
+        pass
+
+
+@dataclass
+class BenchmarkRunner:
+    scenarios: list[BenchmarkScenario]
+    repeat: int = 3
+
+    @staticmethod
+    def _run_stages(scenario: BenchmarkScenario, measure: _Measure):
+        universe = Universe()
+
+        if scenario.population > 0:
+            target_difficulty = DifficultyReport()
+            target_difficulty.set_all_parameters(UNUSED_PARAMETER)
+            target_difficulty.set_parameter(RoomParameter.REWARD, 500)
+            target_difficulty.set_parameter(RoomParameter.JUMP, 10)
+            target_difficulty.set_parameter(RoomParameter.ENEMY, 100)
+            target_difficulty.set_parameter(RoomParameter.SPRAWL, 50)
+
+            if scenario.islands > 0:
+                # Includes starting the worker processes, the memory used by the workers is not traced
+                island_optimizer = IslandOptimizer(
+                    target_difficulty,
+                    Random(scenario.seed),
+                    island_count=scenario.islands,
+                    max_population=scenario.population,
+                    max_generations=scenario.generations,
+                )
+                measure("island_optimize", island_optimizer.optimize)
+                return
+
+            optimizer = DifficultyOptimizer(
+                universe,
+                target_difficulty=target_difficulty,
+                random=Random(scenario.seed),
+                max_population=scenario.population,
+                max_generations=scenario.generations,
+            )
+
+            if scenario.workers > 0:
+                measure("steady_state_optimize", SteadyStateOptimizer(optimizer, worker_count=scenario.workers).optimize)
+                return
+
+            measure("initialize_population", optimizer.initialize_population)
+            measure("optimize", optimizer.optimize)
+            return
+
+        map_generator = MapGenerator(scenario.get_requirements())
+        for stage in [GenerationStage.LAYOUT, GenerationStage.ALTARS, GenerationStage.KEYS, GenerationStage.PREFABS]:
+            measure(stage.name.lower(), lambda: map_generator.generate(target_stage=stage))
+
+        map = map_generator.map
+        path_finder = PathFinder(map)
+        solution = measure("solve", LevelSolver(map, path_finder).solve)
+        if solution is None:
+            return
+
+        optimizer = DifficultyOptimizer(universe, target_difficulty=DifficultyReport(), random=Random(scenario.seed))
+        measure("difficulty", lambda: optimizer.get_difficulty_along_path(map, solution.get_steps_as_single_path()))
+
+    def run_scenario(self, scenario: BenchmarkScenario):
+        # The warm-up run fills caches like compiled prefabs, so the results measure steady-state performance
+        self._run_stages(scenario, lambda name, function: function())
+
+        timing = _TimingPass()
+        for _ in range(self.repeat):
+            self._run_stages(scenario, timing)
+
+        # Tracing allocations slows everything down, so memory is measured in a separate run
+        memory = _MemoryPass()
+        tracemalloc.start()
+        try:
+            self._run_stages(scenario, memory)
+        finally:
+            tracemalloc.stop()
+
+        return {
+            name: StageResult(median(times), min(times), *memory.results.get(name, (0, 0, 0)))
+            for name, times in timing.times.items()
+        }
+
+    def run(self):
+        results = BenchmarkResults()
+
+        for scenario in self.scenarios:
+            start = perf_counter()
+            # Generation code reports progress using prints, which would dominate the output and the timings
+            with open(os.devnull, "wt") as devnull, redirect_stdout(devnull):
+                results.scenarios[scenario.name] = self.run_scenario(scenario)
+            print(f"Finished scenario {scenario.name} in {(perf_counter() - start) * 1000:.2f} ms")
+
+        return results
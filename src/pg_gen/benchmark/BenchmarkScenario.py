@@ -0,0 +1,42 @@
+from dataclasses import dataclass
+from math import ceil, sqrt
+
+from ..generation.Requirements import Requirements
+
+
+@dataclass(frozen=True)
+class BenchmarkScenario:
+    name: str
+    seed: float
+    max_rooms: int = 50
+    altar_count: int = 1
+    # Scenarios with a population run the whole optimizer instead of the individual stages
+    population: int = 0
+    generations: int = 2
+    # Scenarios with islands run the island optimizer, with the population being the size of each island
+    islands: int = 0
+    # Scenarios with workers run the steady-state optimizer
+    workers: int = 0
+
+    def get_requirements(self):
+        # The map must be large enough to fit all the rooms, otherwise the layout stops early
+        size = max(10, ceil(sqrt(self.max_rooms) * 2.5))
+        return Requirements(seed=self.seed, max_rooms=self.max_rooms, max_width=size, max_height=size, altar_count=self.altar_count)
+
+    @staticmethod
+    def get_default_scenarios():
+        scenarios: list[BenchmarkScenario] = []
+
+        for max_rooms in [10, 50, 100, 250, 500]:
+            scenarios.append(BenchmarkScenario(f"rooms-{max_rooms}", seed=0.5, max_rooms=max_rooms))
+
+        for altar_count in [0, 2, 3]:
+            scenarios.append(BenchmarkScenario(f"altars-{altar_count}", seed=0.25, max_rooms=50, altar_count=altar_count))
+
+        for population in [10, 20]:
+            scenarios.append(BenchmarkScenario(f"population-{population}", seed=108561, population=population))
+
+        scenarios.append(BenchmarkScenario("islands-4", seed=108561, population=10, islands=4))
+        scenarios.append(BenchmarkScenario("steady-state-4", seed=108561, population=10, workers=4))
+
+        return scenarios
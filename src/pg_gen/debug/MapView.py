@@ -4,7 +4,7 @@ from typing import Callable, override
 import pygame
 
 from ..actors.support.GuiRenderer import GuiRenderer
-from ..game_core.Camera import CameraClient
+from ..game_core.CameraClient import CameraClient
 from ..game_core.InputClient import InputClient
 from ..game_core.ResourceClient import ResourceClient
 from ..generation.RoomController import RoomController
@@ -0,0 +1,339 @@
+import sys
+from argparse import ArgumentParser
+from itertools import chain, pairwise
+from random import Random
+from time import perf_counter
+from pathlib import Path
+from traceback import print_exc
+
+import pygame
+
+from .actors.Player import Player
+from .benchmark.BenchmarkRunner import BenchmarkResults, BenchmarkRunner
+from .benchmark.BenchmarkScenario import BenchmarkScenario
+from .debug.MapView import MapView
+from .difficulty.DifficultyOptimizer import DifficultyOptimizer
+from .difficulty.DifficultyReport import DifficultyReport
+from .difficulty.LevelSolver import LevelSolver, LevelSolverState
+from .difficulty.ReachabilityAnalyzer import ReachabilityAnalyzer
+from .difficulty.ReplayVerifier import ReplayResult, ReplayVerifier
+from .game_core.InputRecording import InputRecording
+from .game_core.InteractiveGameLoop import InteractiveGameLoop
+from .game_core.Universe import Universe
+from .generation.RoomController import RoomController, RoomPreloader
+from .generation.RoomParameter import UNUSED_PARAMETER, RoomParameter, RoomParameterCollection
+from .generation.RoomPrefabRegistry import RoomPrefabRegistry
+from .level_editor.ActorRegistry import ActorRegistry
+from .level_editor.LevelEditor import LevelEditor
+from .support.Color import Color
+from .support.constants import ROOM_HEIGHT, ROOM_WIDTH
+from .support.Point import Point
+from .support.StartupProfiler import StartupProfiler
+from .world.World import World
+
+
+def start_interactive_game_demo():
+    with StartupProfiler.phase("pygame.init"):
+        pygame.init()
+    with StartupProfiler.phase("RoomPrefabRegistry.load"):
+        RoomPrefabRegistry.load()
+    with StartupProfiler.phase("ActorRegistry.load_actors"):
+        ActorRegistry.load_actors()
+    # Only use analysis results that were already computed, run analyze-rooms to update them
+    with StartupProfiler.phase("ReachabilityAnalyzer.apply_to_registry"):
+        ReachabilityAnalyzer().apply_to_registry(analyze_missing=False)
+
+    universe = Universe()
+
+    target_difficulty = DifficultyReport()
+    target_difficulty.set_all_parameters(UNUSED_PARAMETER)
+    target_difficulty.set_parameter(RoomParameter.REWARD, 500)
+    target_difficulty.set_parameter(RoomParameter.JUMP, 10)
+    target_difficulty.set_parameter(RoomParameter.ENEMY, 100)
+    target_difficulty.set_parameter(RoomParameter.SPRAWL, 50)
+
+    optimizer = DifficultyOptimizer(
+        universe,
+        target_difficulty=target_difficulty,
+        random=Random(108561),
+        max_population=10,
+        max_generations=1,
+    )
+
+    start = perf_counter()
+    with StartupProfiler.phase("Level generation"):
+        optimizer.initialize_population()
+        optimizer.optimize()
+    end = perf_counter()
+    print(f"Optimization took: {(end-start)*1000:.2f} ms")
+
+    best_candidate = optimizer.get_best_candidate()
+    print(f"Best candidate: {optimizer.get_best_difficulty()} {best_candidate.requirements}")
+    map = best_candidate.get_map()
+    universe.map = map
+    universe.di.register(RoomPreloader, RoomPreloader(universe))
+
+    def map_click_callback(button: int, position: Point):
+        if button != pygame.BUTTON_LEFT:
+            return
+        room_controller = map_view.room_controller
+        if room_controller is None:
+            return
+        room_controller.switch_rooms_absolute(None, position)
+        pass
+
+    room_controller = RoomController.initialize_and_activate(universe, map.get_room(Point.ZERO), None)
+    map_view = MapView(click_callback=map_click_callback)
+    room_controller.world.add_actor(map_view)
+
+    solution = best_candidate.solution
+    assert solution is not None
+    for i, path in enumerate(solution.steps):
+        _add_annotation_for_path(map_view, path, i)
+
+    room_controller.world.add_actor(Player(position=Point(ROOM_WIDTH / 2, ROOM_HEIGHT / 2)))
+
+    if len(sys.argv) > 1 and sys.argv[1] == "only-generate":
+        StartupProfiler.report()
+        sys.exit(0)
+
+    recording_path: str | None = None
+    if len(sys.argv) > 2 and sys.argv[1] == "record":
+        recording_path = sys.argv[2]
+
+    game_loop = InteractiveGameLoop(universe)
+
+    if recording_path is not None:
+        game_loop.recording = InputRecording(
+            requirements=best_candidate.requirements,
+            override_seed=best_candidate.override_seed,
+            reachability_applied=ReachabilityAnalyzer.is_applied_to_registry(),
+        )
+
+    game_loop.run()
+
+    if recording_path is not None:
+        assert game_loop.recording is not None
+        ReplayResult.capture(universe, len(game_loop.recording.frames), game_loop.game_over_reached).store_into(game_loop.recording)
+        game_loop.recording.save(recording_path)
+        print(f"Saved recording of {len(game_loop.recording.frames)} frames to {recording_path}")
+
+
+def start_replay_verification():
+    with StartupProfiler.phase("RoomPrefabRegistry.load"):
+        RoomPrefabRegistry.load()
+    with StartupProfiler.phase("ActorRegistry.load_actors"):
+        ActorRegistry.load_actors()
+
+    failed = 0
+    for recording_path in sys.argv[1:]:
+        recording = InputRecording.load(recording_path)
+
+        start = perf_counter()
+        result, errors = ReplayVerifier.verify(recording)
+        end = perf_counter()
+
+        if len(errors) == 0:
+            print(f"[OK] {recording_path}: {result.frame_count} frames in {(end-start)*1000:.2f} ms")
+        else:
+            failed += 1
+            print(f"[FAIL] {recording_path}:")
+            for error in errors:
+                print(f"  {error}")
+
+    print(f"Verified {len(sys.argv) - 1} recordings, {failed} failed")
+    sys.exit(1 if failed > 0 else 0)
+
+
+def start_room_bundle_build():
+    # Compiled levels are stored in the bundle, which requires the actor types
+    ActorRegistry.load_actors()
+
+    start = perf_counter()
+    bundle_path = RoomPrefabRegistry.build_bundle()
+    end = perf_counter()
+
+    if bundle_path is None:
+        print("Room files are not stored in a directory, cannot build a bundle")
+        sys.exit(1)
+
+    print(f"Room bundle with {len(RoomPrefabRegistry.get_prefabs())} prefabs built in {(end-start)*1000:.2f} ms, saved to {bundle_path}")
+
+
+def start_actor_manifest_build():
+    manifest_path = ActorRegistry.build_manifest()
+    print(f"Actor manifest with {len(ActorRegistry.get_actor_types())} actors saved to {manifest_path}")
+
+
+def start_benchmark():
+    parser = ArgumentParser(prog="benchmark", description="Runs fixed-seed generation, solving and difficulty scoring scenarios")
+    parser.add_argument("--filter", help="only run scenarios containing this string")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per scenario")
+    parser.add_argument("--save", type=Path, help="save results as a baseline")
+    parser.add_argument("--compare", type=Path, help="compare results to a baseline and fail on regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative change considered a regression")
+    arguments = parser.parse_args()
+
+    with StartupProfiler.phase("RoomPrefabRegistry.load"):
+        RoomPrefabRegistry.load()
+    with StartupProfiler.phase("ActorRegistry.load_actors"):
+        ActorRegistry.load_actors()
+
+    scenarios = [scenario for scenario in BenchmarkScenario.get_default_scenarios() if arguments.filter is None or arguments.filter in scenario.name]
+    results = BenchmarkRunner(scenarios, repeat=arguments.repeat).run()
+    results.print_table()
+
+    if arguments.save is not None:
+        results.save(arguments.save)
+        print(f"Saved baseline to {arguments.save}")
+
+    if arguments.compare is not None:
+        regressions = results.compare(BenchmarkResults.load(arguments.compare), arguments.threshold)
+        for regression in regressions:
+            print(f"[REGRESSION] {regression}")
+
+        print(f"Compared to {arguments.compare}, {len(regressions)} regressions")
+        sys.exit(1 if len(regressions) > 0 else 0)
+
+
+def start_reachability_analysis():
+    with StartupProfiler.phase("RoomPrefabRegistry.load"):
+        RoomPrefabRegistry.load()
+    with StartupProfiler.phase("ActorRegistry.load_actors"):
+        ActorRegistry.load_actors()
+
+    analyzer = ReachabilityAnalyzer()
+    start = perf_counter()
+    analyzer.apply_to_registry()
+    end = perf_counter()
+
+    for prefab in RoomPrefabRegistry.get_prefabs():
+        if prefab.reachability is None:
+            continue
+
+        for connected, routes in prefab.reachability.routes.items():
+            missing = [f"{entrance.name}->{exit.name}" for entrance in connected for exit in connected if entrance != exit and (entrance, exit) not in routes]
+            if len(missing) > 0:
+                print(f"Room {prefab.name} {prefab.groups} connected {", ".join(direction.name for direction in connected)}: unreachable {", ".join(missing)}")
+
+    print(f"Reachability analysis took: {(end-start)*1000:.2f} ms, results saved to {analyzer.cache_path}")
+
+
+def start_editor():
+    with StartupProfiler.phase("pygame.init"):
+        pygame.init()
+    with StartupProfiler.phase("ActorRegistry.load_actors"):
+        ActorRegistry.load_actors()
+
+    file_path: str | None = None
+    if len(sys.argv) > 1:
+        file_path = sys.argv[1]
+
+    universe = Universe()
+
+    world = World(universe)
+    universe.set_world(world)
+
+    game_loop = InteractiveGameLoop(universe)
+
+    level_editor = LevelEditor(file_path=file_path)
+    world.add_actor(level_editor)
+    if file_path is not None:
+        level_editor.open_file(file_path)
+
+    game_loop.run()
+    level_editor.close()
+
+
+_path_colors = [Color.GREEN, Color.CYAN, Color.MAGENTA, Color.WHITE, Color.ORANGE]
+
+
+def _add_annotation_for_path(map_view: MapView, path: list[Point], index: int):
+    for node, next in pairwise(chain(path, [path[-1]])):
+        label = str(index)
+        if node == path[0]:
+            label += "^"
+        elif node == path[-1]:
+            label += "*"
+        map_view.add_annotation(node, label, _path_colors[index % len(_path_colors)])
+
+        if next == node:
+            continue
+
+        vector = next - node
+        map_view.add_annotation(node, ((index % 10) - 5, vector.as_direction()), _path_colors[index % len(_path_colors)])
+
+
+def start_pathfinding_demo():
+    with StartupProfiler.phase("pygame.init"):
+        pygame.init()
+    with StartupProfiler.phase("ActorRegistry.load_actors"):
+        ActorRegistry.load_actors()
+
+    with StartupProfiler.phase("RoomPrefabRegistry.load"):
+        RoomPrefabRegistry.load()
+
+    universe = Universe()
+
+    target_difficulty = RoomParameterCollection()
+    target_difficulty.set_all_parameters(UNUSED_PARAMETER)
+    optimizer = DifficultyOptimizer(universe, target_difficulty, Random(108561), max_population=1)
+
+    optimizer.get_parameter("max_rooms").override_value(100)
+    optimizer.get_parameter("max_width").override_value(100)
+    optimizer.get_parameter("max_height").override_value(100)
+
+    optimizer.initialize_population()
+    best_candidate = optimizer.get_best_candidate()
+    map = best_candidate.get_map()
+    universe.map = map
+
+    viewer_world = World(universe)
+
+    start: Point | None = None
+    end: Point | None = None
+
+    def click_callback(button: int, position: Point):
+        nonlocal start, end
+
+        if button == pygame.BUTTON_LEFT:
+            start = position
+        elif button == pygame.BUTTON_RIGHT:
+            end = position
+        else:
+            return
+
+        map_view.clear_annotations()
+        if start is not None:
+            map_view.add_annotation(start, "Start", Color.CYAN)
+
+        if end is not None:
+            map_view.add_annotation(end, "End", Color.ORANGE)
+
+        if start is not None and end is not None:
+            state = LevelSolverState(position=start)
+            level_solver = LevelSolver(map, best_candidate.get_path_finder())
+            try:
+                state = level_solver.solve_path(state, end)
+                assert state is not None
+                for i, step in enumerate(state.steps):
+                    _add_annotation_for_path(map_view, step, i)
+            except AssertionError:
+                print_exc()
+                print("!! Failed to find path")
+
+    map_view = MapView(
+        always_show=True,
+        click_callback=click_callback,
+    )
+    viewer_world.add_actor(map_view)
+
+    universe.set_world(viewer_world)
+
+    solution = best_candidate.solution
+    assert solution is not None
+    for i, path in enumerate(solution.steps):
+        _add_annotation_for_path(map_view, path, i)
+
+    game_loop = InteractiveGameLoop(universe)
+    game_loop.run()
@@ -0,0 +1,94 @@
+from dataclasses import dataclass, field
+from math import ceil, inf
+from random import Random
+from time import perf_counter
+from typing import Any
+
+from ..game_core.Universe import Universe
+from ..generation.RoomParameter import RoomParameterCollection
+from .DifficultyOptimizer import DifficultyOptimizer, LevelCandidate, TerminationReason
+from .DifficultyReport import DifficultyReport
+
+
+@dataclass
+class BatchOptimizer:
+    # Optimizes levels for multiple targets at once. Every target has its own population, but all of them share
+    # the evaluations, and every generation each target breeds only its share of the children. All children are
+    # then ranked against every target, so the run costs about as many evaluations as optimizing a single target.
+    universe: Universe
+    target_difficulties: list[RoomParameterCollection]
+    random: Random
+    max_population: int = 10
+    max_generations: int = 5
+    # Forwarded to the DifficultyOptimizer of each target, for example the selection factor or a surrogate
+    options: dict[str, Any] = field(default_factory=lambda: {})
+
+    optimizers: list[DifficultyOptimizer] = field(default_factory=lambda: [])
+    evaluations: dict[tuple, DifficultyReport | None] = field(default_factory=lambda: {})
+    generation_count: int = 0
+    termination_reason: TerminationReason | None = None
+
+    def get_evaluation_count(self):
+        return sum(optimizer.evaluation_count for optimizer in self.optimizers)
+
+    def get_best_candidate(self, target_index: int):
+        return self.optimizers[target_index].get_best_candidate()
+
+    def get_best_fitness(self, target_index: int):
+        return self.optimizers[target_index].get_best_fitness()
+
+    def get_best_difficulty(self, target_index: int):
+        return self.optimizers[target_index].get_best_difficulty()
+
+    def _merge_into_all(self, candidates: list[LevelCandidate]):
+        # Only the first optimizer evaluates the candidates, the rest find them in the shared evaluations
+        for optimizer in self.optimizers:
+            optimizer.merge_candidates(candidates)
+
+    def initialize_population(self):
+        self.optimizers = [
+            DifficultyOptimizer(
+                self.universe,
+                target_difficulty=target_difficulty,
+                random=Random(self.random.random()),
+                max_population=self.max_population,
+                evaluations=self.evaluations,
+                **self.options,
+            )
+            for target_difficulty in self.target_difficulties
+        ]
+
+        self._merge_into_all([LevelCandidate(self.optimizers[0].create_random_requirements()) for _ in range(self.max_population)])
+
+    def optimize(self):
+        start_time = perf_counter()
+        children_per_target = ceil(self.max_population / len(self.optimizers))
+        self.generation_count = 0
+
+        while True:
+            # All targets rank the same candidates, so either all of them have a population or none do
+            if len(self.optimizers[0].valid_candidates) == 0:
+                self.termination_reason = TerminationReason.STALLED
+                break
+
+            if all(optimizer.get_best_fitness() == inf for optimizer in self.optimizers):
+                self.termination_reason = TerminationReason.TARGET_REACHED
+                break
+
+            if self.generation_count >= self.max_generations:
+                self.termination_reason = TerminationReason.MAX_GENERATIONS
+                break
+
+            children: list[LevelCandidate] = []
+            for optimizer in self.optimizers:
+                children.extend(optimizer.breed_children(children_per_target))
+
+            self._merge_into_all(children)
+            self.generation_count += 1
+
+        end_time = perf_counter()
+        print(
+            f"Batch optimization of {len(self.optimizers)} targets stopped after {self.generation_count} generations "
+            + f"and {self.get_evaluation_count()} evaluations in {(end_time - start_time) * 1000:.2f} ms: {self.termination_reason.value}"
+        )
+        return self.termination_reason
@@ -0,0 +1,136 @@
+import heapq
+import json
+import sqlite3
+from dataclasses import dataclass, field
+from hashlib import sha1
+from pathlib import Path
+from typing import Any, Callable
+
+from ..assets import get_pg_assets
+from ..generation.Requirements import Requirements
+from ..generation.RoomParameter import RoomParameter
+from ..generation.RoomPrefabRegistry import RoomPrefabRegistry
+from .DifficultyReport import DifficultyReport
+from .OptimizerWorker import OptimizerWorker
+
+ARCHIVE_VERSION = 1
+
+_DIFFICULTY_COLUMNS = [parameter.name.lower() for parameter in RoomParameter]
+
+
+@dataclass
+class ArchivedCandidate:
+    requirements: Requirements
+    override_seed: float | None
+    # Unsolvable candidates are archived without a difficulty
+    difficulty: DifficultyReport | None
+    solution_length: float | None = None
+    map_hash: str | None = None
+
+    def get_key(self):
+        return (self.requirements.get_key(), self.override_seed)
+
+
+@dataclass
+class CandidateArchive:
+    # Evaluated candidates stored on disk, so later runs can skip candidates evaluated before and start from the
+    # candidates closest to their target. Entries are only used with the same rooms they were generated with.
+    path: Path = field(default_factory=lambda: Path(str(get_pg_assets().local)) / "candidates.sqlite")
+
+    _connection: sqlite3.Connection | None = field(default=None, init=False)
+    _context: str | None = field(default=None, init=False)
+
+    def __getstate__(self):
+        # The connection cannot be sent to worker processes, each process opens its own
+        state = self.__dict__.copy()
+        state["_connection"] = None
+        state["_context"] = None
+        return state
+
+    @staticmethod
+    def get_candidate_key(requirements: Requirements, override_seed: float | None):
+        return json.dumps([requirements.get_key(), override_seed])
+
+    def get_context(self):
+        if self._context is None:
+            reachability = OptimizerWorker.is_reachability_applied()
+            self._context = sha1(f"{ARCHIVE_VERSION}:{RoomPrefabRegistry.get_content_hash()}:{reachability}".encode()).hexdigest()
+        return self._context
+
+    def _get_connection(self):
+        if self._connection is not None:
+            return self._connection
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS candidates ("
+            + "context TEXT NOT NULL, candidate_key TEXT NOT NULL, requirements TEXT NOT NULL, override_seed REAL, "
+            + "".join(f"{column} REAL, " for column in _DIFFICULTY_COLUMNS)
+            + "solution_length REAL, map_hash TEXT, "
+            + "PRIMARY KEY (context, candidate_key))"
+        )
+        connection.commit()
+        self._connection = connection
+        return connection
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    @staticmethod
+    def _load_row(row: tuple[Any, ...]):
+        requirements_data, override_seed, *parameters, solution_length, map_hash = row
+        difficulty: DifficultyReport | None = None
+        if parameters[0] is not None:
+            difficulty = DifficultyReport()
+            difficulty._parameters = list(parameters)
+
+        return ArchivedCandidate(Requirements.deserialize(json.loads(requirements_data)), override_seed, difficulty, solution_length, map_hash)
+
+    def get(self, requirements: Requirements, override_seed: float | None):
+        row = (
+            self._get_connection()
+            .execute(
+                f"SELECT requirements, override_seed, {", ".join(_DIFFICULTY_COLUMNS)}, solution_length, map_hash FROM candidates WHERE context = ? AND candidate_key = ?",
+                (self.get_context(), self.get_candidate_key(requirements, override_seed)),
+            )
+            .fetchone()
+        )
+        return self._load_row(row) if row is not None else None
+
+    def add(self, candidate: ArchivedCandidate):
+        connection = self._get_connection()
+        difficulty = candidate.difficulty._parameters if candidate.difficulty is not None else [None] * len(_DIFFICULTY_COLUMNS)
+        connection.execute(
+            f"INSERT OR REPLACE INTO candidates VALUES ({", ".join("?" * (6 + len(_DIFFICULTY_COLUMNS)))})",
+            (
+                self.get_context(),
+                self.get_candidate_key(candidate.requirements, candidate.override_seed),
+                json.dumps(candidate.requirements.serialize()),
+                candidate.override_seed,
+                *difficulty,
+                candidate.solution_length,
+                candidate.map_hash,
+            ),
+        )
+        connection.commit()
+
+    def get_candidates(self):
+        # Only solvable candidates, the unsolvable ones are only useful to skip evaluating them again
+        cursor = self._get_connection().execute(
+            f"SELECT requirements, override_seed, {", ".join(_DIFFICULTY_COLUMNS)}, solution_length, map_hash FROM candidates WHERE context = ? AND {_DIFFICULTY_COLUMNS[0]} IS NOT NULL",
+            (self.get_context(),),
+        )
+        for row in cursor:
+            yield self._load_row(row)
+
+    def get_best_candidates(self, count: int, get_fitness: Callable[[DifficultyReport], float]):
+        return heapq.nlargest(count, self.get_candidates(), key=lambda v: get_fitness(v.difficulty) if v.difficulty is not None else 0)
+
+    def get_size(self):
+        (size,) = self._get_connection().execute("SELECT COUNT(*) FROM candidates WHERE context = ?", (self.get_context(),)).fetchone()
+        return size
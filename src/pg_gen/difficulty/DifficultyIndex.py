@@ -0,0 +1,65 @@
+from dataclasses import dataclass, field
+from math import inf
+
+import numpy as np
+
+from ..generation.RoomParameter import UNUSED_PARAMETER, RoomParameterCollection
+from .CandidateArchive import ArchivedCandidate, CandidateArchive
+from .DifficultyOptimizer import FITNESS_WEIGHTS, LevelCandidate
+
+
+@dataclass
+class DifficultyIndex:
+    # Finds the stored candidates closest to a target difficulty without optimizing, using the same weighting as
+    # the optimizer fitness. Every query is a single pass over a float32 matrix of the difficulties, which takes
+    # milliseconds even for archives of hundreds of thousands of candidates. Unsolvable candidates are not indexed.
+    candidates: list[ArchivedCandidate] = field(default_factory=lambda: [])
+
+    # Difficulty of each candidate, the row index of the matrix is the index in the candidates
+    _rows: list[list[float]] = field(default_factory=lambda: [], init=False)
+    _difficulties: np.ndarray | None = field(default=None, init=False)
+
+    def __post_init__(self):
+        candidates = self.candidates
+        self.candidates = []
+        for candidate in candidates:
+            self.add(candidate)
+
+    @staticmethod
+    def from_archive(archive: CandidateArchive):
+        return DifficultyIndex(list(archive.get_candidates()))
+
+    def add(self, candidate: ArchivedCandidate):
+        if candidate.difficulty is None:
+            return
+
+        self.candidates.append(candidate)
+        self._rows.append(candidate.difficulty._parameters)
+        self._difficulties = None
+
+    def _get_difficulties(self):
+        if self._difficulties is None:
+            self._difficulties = np.array(self._rows, dtype=np.float32)
+        return self._difficulties
+
+    def find(self, target_difficulty: RoomParameterCollection, count: int = 1):
+        # Returns the closest candidates with their fitness, best first
+        count = min(count, len(self.candidates))
+        if count <= 0:
+            return []
+
+        target = np.array(target_difficulty._parameters, dtype=np.float32)
+        weights = np.where(target != UNUSED_PARAMETER, np.array(FITNESS_WEIGHTS._parameters, dtype=np.float32), 0)
+        inv_fitness = np.abs(self._get_difficulties() - target) @ weights
+
+        nearest = np.argpartition(inv_fitness, count - 1)[0:count]
+        nearest = nearest[np.argsort(inv_fitness[nearest], kind="stable")]
+        return [(self.candidates[index], 1 / float(inv_fitness[index]) if inv_fitness[index] != 0 else inf) for index in nearest]
+
+    def find_level(self, target_difficulty: RoomParameterCollection):
+        found = self.find(target_difficulty)
+        if len(found) == 0:
+            return None
+
+        candidate, _ = found[0]
+        return LevelCandidate.restore_solved(candidate.requirements, candidate.override_seed, candidate.difficulty)
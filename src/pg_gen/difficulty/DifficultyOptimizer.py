@@ -1,8 +1,13 @@
+from bisect import insort
+from collections import Counter
 from dataclasses import dataclass, field
+from enum import Enum
 from math import inf
 from random import Random
 from time import perf_counter
-from typing import Iterable
+from typing import Any, Iterable
+
+import numpy as np
 
 from ..game_core.Universe import Universe
 from ..generation.Map import Map
@@ -13,10 +18,22 @@ from ..generation.RoomInfo import RoomInfo
 from ..generation.RoomParameter import UNUSED_PARAMETER, RoomParameter, RoomParameterCollection
 from ..support.Point import Point
 from ..support.support import weighted_random
+from ..support.Tracer import Tracer
+from .CandidateArchive import ArchivedCandidate, CandidateArchive
 from .DifficultyReport import DifficultyReport
-from .LevelSolver import LevelSolver, LevelSolverState
+from .DifficultySurrogate import DifficultySurrogate
+from .LevelSolver import LevelSolver, LevelSolverState, SolverBudgetExceeded
 from .PathFinder import PathFinder
 
+# Weight of the difference from the target difficulty in each parameter, parameters unused by the target are ignored
+FITNESS_WEIGHTS = (
+    RoomParameterCollection()
+    .set_parameter(RoomParameter.ENEMY, 0.5)
+    .set_parameter(RoomParameter.JUMP, 0.75)
+    .set_parameter(RoomParameter.REWARD, 0.1)
+    .set_parameter(RoomParameter.SPRAWL, 0.75)
+)
+
 
 @dataclass
 class ParameterInfo:
@@ -46,6 +63,11 @@ class ParameterInfo:
 
         return getattr(target, self.name)
 
+    def get_normalized(self, target: Requirements):
+        if self.max == self.min:
+            return 0
+        return (self.get(target) - self.min) / (self.max - self.min)
+
     def override_value(self, value: float):
         self.range = (value, value)
         self.weight = 0
@@ -58,6 +80,10 @@ class LevelCandidate:
     _path_finder: PathFinder | None = None
 
     solution: LevelSolverState | None = None
+    override_seed: float | None = None
+    # Difficulty along the solution, only set on candidates at the prefabs stage
+    difficulty: DifficultyReport | None = None
+    rejection_reason: "RejectionReason | None" = None
 
     def get_map_generator(self):
         if self._map_generator is None:
@@ -83,6 +109,7 @@ class LevelCandidate:
                 map_generator.generate(target_stage=GenerationStage(stage.value - 1))
                 map_generator.random = Random(override_seed)
                 map_generator.generate(target_stage=stage)
+                regressed_candidate.override_seed = override_seed
             else:
                 map_generator.generate(target_stage=stage)
             return regressed_candidate
@@ -107,8 +134,58 @@ class LevelCandidate:
             requirements=self.requirements,
             _map_generator=self._map_generator.clone() if self._map_generator else None,
             solution=self.solution,
+            override_seed=self.override_seed,
+            difficulty=self.difficulty,
         )
 
+    def get_key(self):
+        return (self.requirements.get_key(), self.override_seed)
+
+    @staticmethod
+    def restore(requirements: Requirements, override_seed: float | None, stage: GenerationStage = GenerationStage.PREFABS):
+        # Reproduces a candidate created by the optimizer, the override seed is always applied
+        # after the layout, the same as when regressing a candidate to the altars stage
+        if override_seed is None:
+            # New candidates are generated from a clone of the empty generator, which does not keep the pending
+            # rooms, so generating directly from a new generator would produce a different layout
+            return LevelCandidate(requirements).ensure_generation_stage(stage, allow_greater=True)
+
+        candidate = LevelCandidate(requirements, override_seed=override_seed)
+        map_generator = candidate.get_map_generator()
+        map_generator.generate(target_stage=GenerationStage.LAYOUT)
+        map_generator.random = Random(override_seed)
+        map_generator.generate(target_stage=stage)
+        return candidate
+
+    @staticmethod
+    def restore_solved(requirements: Requirements, override_seed: float | None, difficulty: DifficultyReport | None = None):
+        # Candidates evaluated elsewhere only keep their requirements, so the map and its solution are generated again to be played
+        candidate = LevelCandidate.restore(requirements, override_seed, GenerationStage.PREFABS)
+        candidate.solution = LevelSolver(candidate.get_map(), candidate.get_path_finder()).solve()
+        candidate.difficulty = difficulty
+        return candidate
+
+
+class RejectionReason(Enum):
+    UNSOLVABLE = "unsolvable"
+    SOLVER_EXPANSIONS = "solver_expansions"
+    SOLVER_TIME = "solver_time"
+
+
+class TerminationReason(Enum):
+    MAX_GENERATIONS = "max_generations"
+    # Fitness is infinite when the difficulty matches the target exactly, no candidate can be better
+    TARGET_REACHED = "target_reached"
+    FITNESS_THRESHOLD = "fitness_threshold"
+    STALLED = "stalled"
+    TIME_BUDGET = "time_budget"
+    EVALUATION_BUDGET = "evaluation_budget"
+
+
+class EmptyPopulationError(Exception):
+    def __init__(self):
+        super().__init__("No candidate in the population could be generated and solved")
+
 
 @dataclass
 class DifficultyOptimizer:
@@ -120,6 +197,37 @@ class DifficultyOptimizer:
     selection_factor: float = 0.3
     max_generations: int = 5
 
+    # Stopping criteria, the run also always stops when a candidate reaches the target difficulty exactly
+    fitness_threshold: float = inf
+    # Number of generations without improvement of the best fitness, after which the run stops
+    max_stall_generations: int | None = None
+    # Wall-clock time in seconds, checked between generations
+    time_budget: float | None = None
+    # Maximum number of candidate evaluations, a generation is not started if it would exceed the budget
+    evaluation_budget: int | None = None
+
+    # Per-candidate limits, candidates exceeding them are rejected so one unlucky map cannot stall the run
+    solver_expansion_budget: int | None = None
+    candidate_time_budget: float | None = None
+
+    # Optional model predicting the difficulty of new candidates, children predicted to be worse than the
+    # selection cutoff by more than the margin are discarded before being evaluated
+    surrogate: DifficultySurrogate | None = None
+    surrogate_margin: float = 0.5
+    # Consecutive discarded children after which the next one is accepted, so a bad model cannot stall a generation
+    surrogate_rejection_limit: int = 5
+
+    # Optional on-disk archive of evaluated candidates, candidates found in it are not evaluated again
+    archive: CandidateArchive | None = None
+    # Part of the initial population taken from the archived candidates closest to the target, the rest is random
+    archive_seed_factor: float = 0.5
+
+    evaluation_count: int = 0
+    surrogate_rejection_count: int = 0
+    rejection_counts: dict[RejectionReason, int] = field(default_factory=lambda: {})
+    generation_count: int = 0
+    termination_reason: TerminationReason | None = None
+
     parameters: list[ParameterInfo] = field(
         default_factory=lambda: [
             ParameterInfo("seed", is_float=True, range=(0, 1), weight=0.1),
@@ -136,12 +244,20 @@ class DifficultyOptimizer:
     )
 
     valid_candidates: list[tuple[LevelCandidate, LevelCandidate, float, DifficultyReport]] = field(default_factory=lambda: [])
+    # Difficulty of all evaluated candidates, so duplicates are not evaluated again. Rejected candidates are stored as None.
+    # Maps are not kept, they are generated again if a cached candidate is bred from or played.
+    evaluations: dict[tuple, DifficultyReport | None] = field(default_factory=lambda: {})
 
     def _apply_random_parameters(self, target: Requirements):
         for parameter in self.parameters:
             value = self.random.uniform(parameter.min, parameter.max) if parameter.is_float else self.random.randint(int(parameter.min), int(parameter.max))
             parameter.set(target, value)
 
+    def create_random_requirements(self):
+        requirements = Requirements(seed=0)
+        self._apply_random_parameters(requirements)
+        return requirements
+
     def _mutate_random_parameter(self, target: Requirements):
         parameter = weighted_random(self.parameters, self.random.random(), lambda v: v.weight)
         value = parameter.get(target)
@@ -169,35 +285,33 @@ class DifficultyOptimizer:
     def get_parameter(self, name: str | RoomParameter):
         return next(v for v in self.parameters if v.name == name)
 
+    def _get_best_entry(self):
+        # Every candidate can be rejected, for example by tight solver budgets, leaving the population empty
+        if len(self.valid_candidates) == 0:
+            raise EmptyPopulationError()
+        return self.valid_candidates[0]
+
     def get_best_candidate(self):
-        return self.valid_candidates[0][1]
+        keys_stage, prefabs_stage, fitness, difficulty = self._get_best_entry()
+        if prefabs_stage._map_generator is None:
+            # Candidates loaded from the archive or evaluated in other processes do not have maps
+            prefabs_stage = LevelCandidate.restore_solved(prefabs_stage.requirements, prefabs_stage.override_seed, difficulty)
+            self.valid_candidates[0] = (keys_stage, prefabs_stage, fitness, difficulty)
+        return prefabs_stage
 
     def get_best_fitness(self):
-        return self.valid_candidates[0][2]
+        return self._get_best_entry()[2]
 
     def get_best_difficulty(self):
-        return self.valid_candidates[0][3]
+        return self._get_best_entry()[3]
 
     def evaluate_candidates(self, candidates: list[LevelCandidate]):
         start_time = perf_counter()
         self.valid_candidates.clear()
 
-        for candidate in candidates:
-            keys_stage = candidate.ensure_generation_stage(GenerationStage.KEYS, allow_greater=True)
-            solver = LevelSolver(keys_stage.get_map(), keys_stage.get_path_finder())
-
-            if keys_stage.solution is None:
-                solution = solver.solve()
-                if solution is None:
-                    continue
-
-                keys_stage.solution = solution
-
-            prefabs_stage = keys_stage.ensure_generation_stage(GenerationStage.PREFABS, allow_greater=True)
-            assert prefabs_stage.solution is not None
-            difficulty = self.get_difficulty_along_path(prefabs_stage.get_map(), prefabs_stage.solution.get_steps_as_single_path())
-            fitness = self.get_fitness(difficulty)
-            self.valid_candidates.append((keys_stage, prefabs_stage, fitness, difficulty))
+        for index, candidate in enumerate(candidates):
+            with Tracer.span("candidate", "optimizer", index=index, requirements=candidate.requirements) as span:
+                self._evaluate_candidate(candidate, span)
 
         self.valid_candidates.sort(key=lambda v: v[2], reverse=True)
         end_time = perf_counter()
@@ -205,85 +319,304 @@ class DifficultyOptimizer:
         print(f"Evaluating candidates took: {(end_time - start_time) * 1000:.2f} ms")
         print(f"Generation candidate fitness: {[x[2] for x in self.valid_candidates]}")
 
+    def _evaluate_candidate(self, candidate: LevelCandidate, span: dict[str, Any]):
+        key = candidate.get_key()
+        if key in self.evaluations:
+            Tracer.count("evaluation_cache_hits")
+            evaluation = self._get_cached_evaluation(candidate.requirements, candidate.override_seed, self.evaluations[key])
+        elif candidate.difficulty is not None:
+            # Elites are carried over already evaluated, for example from the archive when seeding the population
+            Tracer.count("evaluation_cache_hits")
+            evaluation = (candidate, candidate)
+            self.evaluations[key] = candidate.difficulty
+        elif self.archive is not None and (archived := self.archive.get(candidate.requirements, candidate.override_seed)) is not None:
+            Tracer.count("archive_hits")
+            evaluation = self._load_archived(archived)
+            self.evaluations[key] = archived.difficulty
+        else:
+            evaluation = self.solve_candidate(candidate)
+            self.evaluations[key] = evaluation[1].difficulty if evaluation is not None else None
+
+        if evaluation is None:
+            Tracer.count("rejected_candidates")
+            span["rejected"] = True
+            return
+
+        keys_stage, prefabs_stage = evaluation
+        assert prefabs_stage.difficulty is not None
+        fitness = self.get_fitness(prefabs_stage.difficulty)
+        self.valid_candidates.append((keys_stage, prefabs_stage, fitness, prefabs_stage.difficulty))
+        span["fitness"] = fitness
+
+    def solve_candidate(self, candidate: LevelCandidate):
+        self.evaluation_count += 1
+        Tracer.count("evaluated_candidates")
+        deadline = perf_counter() + self.candidate_time_budget if self.candidate_time_budget is not None else None
+
+        keys_stage = candidate.ensure_generation_stage(GenerationStage.KEYS, allow_greater=True)
+        solver = LevelSolver(keys_stage.get_map(), keys_stage.get_path_finder(), max_expansions=self.solver_expansion_budget, deadline=deadline)
+
+        if keys_stage.solution is None:
+            try:
+                solution = solver.solve()
+            except SolverBudgetExceeded as error:
+                print(f"Rejecting candidate: {error}")
+                return self._reject(candidate, RejectionReason.SOLVER_TIME if error.reason == "time" else RejectionReason.SOLVER_EXPANSIONS)
+
+            if solution is None:
+                self._archive_evaluation(candidate, None)
+                return self._reject(candidate, RejectionReason.UNSOLVABLE)
+
+            keys_stage.solution = solution
+        else:
+            Tracer.count("reused_solutions")
+
+        prefabs_stage = keys_stage.ensure_generation_stage(GenerationStage.PREFABS, allow_greater=True)
+        assert prefabs_stage.solution is not None
+        prefabs_stage.difficulty = self.get_difficulty_along_path(prefabs_stage.get_map(), prefabs_stage.solution.get_steps_as_single_path())
+
+        if self.surrogate is not None:
+            self.surrogate.add_sample(self._get_features(candidate.requirements), prefabs_stage.difficulty)
+
+        self._archive_evaluation(candidate, prefabs_stage)
+        return keys_stage, prefabs_stage
+
+    def _archive_evaluation(self, candidate: LevelCandidate, prefabs_stage: LevelCandidate | None):
+        # Candidates rejected because of a budget are not archived, they could be solvable with a different budget
+        if self.archive is None:
+            return
+
+        if prefabs_stage is None:
+            self.archive.add(ArchivedCandidate(candidate.requirements, candidate.override_seed, None))
+            return
+
+        assert prefabs_stage.solution is not None
+        self.archive.add(
+            ArchivedCandidate(candidate.requirements, candidate.override_seed, prefabs_stage.difficulty, prefabs_stage.solution.length, prefabs_stage.get_map().get_hash())
+        )
+
+    def _load_archived(self, archived: ArchivedCandidate):
+        if archived.difficulty is None:
+            return None
+
+        if self.surrogate is not None:
+            self.surrogate.add_sample(self._get_features(archived.requirements), archived.difficulty)
+
+        return self._get_cached_evaluation(archived.requirements, archived.override_seed, archived.difficulty)
+
+    @staticmethod
+    def _get_cached_evaluation(requirements: Requirements, override_seed: float | None, difficulty: DifficultyReport | None):
+        if difficulty is None:
+            return None
+
+        candidate = LevelCandidate(requirements, override_seed=override_seed, difficulty=difficulty)
+        return candidate, candidate
+
+    def _reject(self, candidate: LevelCandidate, reason: RejectionReason):
+        candidate.rejection_reason = reason
+        self.rejection_counts[reason] = self.rejection_counts.get(reason, 0) + 1
+        Tracer.count(f"rejected_{reason.value}")
+        return None
+
+    def insert_evaluation(self, requirements: Requirements, override_seed: float | None, difficulty: DifficultyReport | None, rejection_reason: RejectionReason | None = None):
+        # Adds a candidate evaluated elsewhere into the ranked population, replacing the worst candidate if it is full.
+        # The candidate does not keep its map, it can be recreated using LevelCandidate.restore.
+        candidate = LevelCandidate(requirements, override_seed=override_seed, difficulty=difficulty)
+        if difficulty is None:
+            self.evaluations[candidate.get_key()] = None
+            self._reject(candidate, rejection_reason or RejectionReason.UNSOLVABLE)
+            Tracer.count("rejected_candidates")
+            return None
+
+        self.evaluations[candidate.get_key()] = difficulty
+        if self.surrogate is not None:
+            self.surrogate.add_sample(self._get_features(requirements), difficulty)
+
+        fitness = self.get_fitness(difficulty)
+        insort(self.valid_candidates, (candidate, candidate, fitness, difficulty), key=lambda v: -v[2])
+        del self.valid_candidates[self.max_population :]
+        return fitness
+
+    def _get_features(self, requirements: Requirements):
+        return [parameter.get_normalized(requirements) for parameter in self.parameters]
+
+    def is_rejected_by_surrogate(self, requirements: Requirements, cutoff_fitness: float):
+        if self.surrogate is None:
+            return False
+
+        prediction = self.surrogate.predict(self._get_features(requirements))
+        if prediction is None:
+            return False
+
+        return self.get_fitness(prediction) * (1 + self.surrogate_margin) < cutoff_fitness
+
     def initialize_population(self):
         candidates: list[LevelCandidate] = []
 
-        for _ in range(self.max_population):
-            requirements = Requirements(seed=0)
-            self._apply_random_parameters(requirements)
-            candidate = LevelCandidate(requirements)
+        if self.archive is not None:
+            for archived in self.archive.get_best_candidates(int(self.max_population * self.archive_seed_factor), self.get_fitness):
+                candidates.append(LevelCandidate(archived.requirements, override_seed=archived.override_seed, difficulty=archived.difficulty))
+
+        while len(candidates) < self.max_population:
+            candidate = LevelCandidate(self.create_random_requirements())
             candidates.append(candidate)
 
+        with Tracer.span("initial population", "optimizer", population=self.max_population):
+            self.evaluate_candidates(candidates)
+
+    def merge_candidates(self, candidates: list[LevelCandidate]):
+        # Evaluates the candidates and keeps the best of them and the current population, candidates already in
+        # the population are skipped, so the same candidate does not take multiple places
+        existing = self.valid_candidates[:]
         self.evaluate_candidates(candidates)
 
-    def optimize(self):
-        last_best_fitness = 0
-        termination_trigger = 0
-        for _ in range(self.max_generations):
-            new_candidates: list[LevelCandidate] = []
-
-            elitism_candidates = self.valid_candidates[0 : int(len(self.valid_candidates) * self.elitism_factor)]
-            new_candidates.extend(candidate[1] for candidate in elitism_candidates)
-
-            selection_candidates = self.valid_candidates[0 : int(len(self.valid_candidates) * self.selection_factor)]
-            while len(new_candidates) < self.max_population:
-                if self.random.random() < 0.3:
-                    before_altars = self.random.choice(selection_candidates)[0]
-                    new_candidate = before_altars.ensure_generation_stage(GenerationStage.ALTARS, allow_greater=False, override_seed=self.random.random())
-                    new_candidates.append(new_candidate)
-                    continue
-
-                parent_a = self.random.choice(selection_candidates)
-
-                if self.random.random() < 0.5:
-                    new_candidate_requirements = parent_a[0].requirements.clone()
-                else:
-                    parent_b = parent_a
-                    while parent_a == parent_b:
-                        parent_b = self.random.choice(selection_candidates)
-
-                    new_candidate_requirements = self._crossover_parameters(parent_a[0].requirements, parent_b[0].requirements)
-
-                self._mutate_random_parameter(new_candidate_requirements)
-                new_candidate = LevelCandidate(new_candidate_requirements)
-                new_candidates.append(new_candidate)
+        population: dict[tuple, tuple[LevelCandidate, LevelCandidate, float, DifficultyReport]] = {}
+        for entry in existing + self.valid_candidates:
+            population.setdefault(entry[1].get_key(), entry)
+
+        self.valid_candidates = sorted(population.values(), key=lambda v: v[2], reverse=True)[0 : self.max_population]
+
+    def add_migrants(self, migrants: list[tuple[Requirements, float | None]]):
+        # Migrants replace the worst candidates, so the population size does not change
+        self.merge_candidates([LevelCandidate.restore(requirements, override_seed, GenerationStage.KEYS) for requirements, override_seed in migrants])
+
+    def _get_termination_reason(self, start_time: float, stall_generations: int):
+        # Every candidate was rejected, there is nothing to breed the next generation from
+        if len(self.valid_candidates) == 0:
+            return TerminationReason.STALLED
+
+        best_fitness = self.get_best_fitness()
+        if best_fitness == inf:
+            return TerminationReason.TARGET_REACHED
+
+        if best_fitness >= self.fitness_threshold:
+            return TerminationReason.FITNESS_THRESHOLD
 
-            self.evaluate_candidates(new_candidates)
+        if self.max_stall_generations is not None and stall_generations >= self.max_stall_generations:
+            return TerminationReason.STALLED
 
-            best_fitness = self.get_best_fitness()
-            if best_fitness == last_best_fitness:
-                termination_trigger += 1
-                # if termination_trigger >= 3:
-                #    break
+        if self.time_budget is not None and perf_counter() - start_time >= self.time_budget:
+            return TerminationReason.TIME_BUDGET
+
+        # Assume the worst case, where no candidate of the next generation was evaluated before
+        if self.evaluation_budget is not None and self.evaluation_count + self.max_population > self.evaluation_budget:
+            return TerminationReason.EVALUATION_BUDGET
+
+        if self.generation_count >= self.max_generations:
+            return TerminationReason.MAX_GENERATIONS
+
+        return None
+
+    def optimize(self):
+        start_time = perf_counter()
+        last_best_fitness = self.get_best_fitness() if len(self.valid_candidates) > 0 else 0
+        stall_generations = 0
+        self.generation_count = 0
+
+        while True:
+            self.termination_reason = self._get_termination_reason(start_time, stall_generations)
+            if self.termination_reason is not None:
+                break
+
+            with Tracer.span("generation", "optimizer", index=self.generation_count) as span:
+                self._run_generation()
+                best_fitness = self.get_best_fitness() if len(self.valid_candidates) > 0 else 0
+                span["best_fitness"] = best_fitness
+            self.generation_count += 1
+
+            if best_fitness <= last_best_fitness:
+                stall_generations += 1
             else:
-                termination_trigger = 0
+                stall_generations = 0
                 last_best_fitness = best_fitness
 
+        print(f"Optimization stopped after {self.generation_count} generations and {self.evaluation_count} evaluations: {self.termination_reason.value}")
+        if self.surrogate is not None:
+            print(f"Surrogate model discarded {self.surrogate_rejection_count} candidates")
+        if len(self.rejection_counts) > 0:
+            print(f"Rejected candidates: {", ".join(f"{reason.value}: {count}" for reason, count in self.rejection_counts.items())}")
+        return self.termination_reason
+
+    def breed_child(self, selection_candidates: list[tuple[LevelCandidate, LevelCandidate, float, DifficultyReport]]):
+        # Children either reroll the generation of a parent after its layout, in which case the parent and the
+        # override seed are returned, or get new requirements by mutating a parent or a crossover of two parents
+        if self.random.random() < 0.3:
+            before_altars = self.random.choice(selection_candidates)[0]
+            return before_altars.requirements, before_altars, self.random.random()
+
+        index_a = self.random.randrange(len(selection_candidates))
+        parent_a = selection_candidates[index_a]
+
+        # Crossover needs two different parents, which a single selection candidate cannot provide
+        if self.random.random() < 0.5 or len(selection_candidates) < 2:
+            requirements = parent_a[0].requirements.clone()
+        else:
+            # Parents are picked by index, the population can contain the same candidate more than once
+            index_b = index_a
+            while index_a == index_b:
+                index_b = self.random.randrange(len(selection_candidates))
+
+            requirements = self._crossover_parameters(parent_a[0].requirements, selection_candidates[index_b][0].requirements)
+
+        self._mutate_random_parameter(requirements)
+        return requirements, None, None
+
+    def _run_generation(self):
+        new_candidates: list[LevelCandidate] = []
+
+        elitism_candidates = self.valid_candidates[0 : int(len(self.valid_candidates) * self.elitism_factor)]
+        new_candidates.extend(candidate[1] for candidate in elitism_candidates)
+        new_candidates.extend(self.breed_children(self.max_population - len(new_candidates)))
+
+        self.evaluate_candidates(new_candidates)
+
+    def breed_children(self, count: int):
+        new_candidates: list[LevelCandidate] = []
+
+        selection_candidates = self.valid_candidates[0 : max(1, int(len(self.valid_candidates) * self.selection_factor))]
+        cutoff_fitness = selection_candidates[-1][2]
+        surrogate_rejections = 0
+        while len(new_candidates) < count:
+            new_candidate_requirements, before_altars, override_seed = self.breed_child(selection_candidates)
+            if before_altars is not None:
+                # Restored instead of regressed, the parent may not have a map if it was loaded from the archive
+                new_candidate = LevelCandidate.restore(before_altars.requirements, override_seed, GenerationStage.ALTARS)
+                new_candidates.append(new_candidate)
+                continue
+
+            if surrogate_rejections < self.surrogate_rejection_limit and self.is_rejected_by_surrogate(new_candidate_requirements, cutoff_fitness):
+                surrogate_rejections += 1
+                self.surrogate_rejection_count += 1
+                Tracer.count("surrogate_rejections")
+                continue
+
+            surrogate_rejections = 0
+            new_candidate = LevelCandidate(new_candidate_requirements)
+            new_candidates.append(new_candidate)
+
+        return new_candidates
+
     def get_room_difficulty(self, room: RoomInfo):
-        RoomController(self.universe, room=room).initialize_room(None)
+        with Tracer.span("room difficulty", "difficulty", prefab=room.prefab.name if room.prefab is not None else None):
+            RoomController(self.universe, room=room).initialize_room(None)
         return room.difficulty
 
     def get_difficulty_along_path(self, map: Map, path: Iterable[Point]):
         start_time = perf_counter()
 
-        report = DifficultyReport()
-        visited_rooms = dict[Point, DifficultyReport]()
-        for room_position in path:
-            # Sprawl is how long the solution is, so increment it for each step of the solution
-            report.increment_parameter(RoomParameter.SPRAWL, 1)
-
-            room = map.rooms[room_position]
-
-            if room_position in visited_rooms:
-                # Do not add reward score if this room was visited already, you can't collect the gems twice
-                difficulty_without_reward = RoomParameterCollection().copy_parameters_from(visited_rooms[room_position])
-                difficulty_without_reward.set_parameter(RoomParameter.REWARD, 0)
-                report.add_parameter_from(difficulty_without_reward)
-                continue
+        # Each room is evaluated once, in the order of the first visit, the path only determines how many times it is counted
+        visits = Counter(path)
+        difficulties = np.array([self.get_room_difficulty(map.rooms[room_position])._parameters for room_position in visits], dtype=float)
+        visit_counts = np.fromiter(visits.values(), dtype=float, count=len(visits))
 
-            difficulty = self.get_room_difficulty(room)
-            report.add_parameter_from(difficulty)
-            visited_rooms[room_position] = difficulty
+        totals = visit_counts @ difficulties
+        # Reward is only added on the first visit, you can't collect the gems twice
+        totals[RoomParameter.REWARD.value] = difficulties[:, RoomParameter.REWARD.value].sum()
+        # Sprawl is how long the solution is, so add one for each step of the solution
+        totals[RoomParameter.SPRAWL.value] += visit_counts.sum()
+
+        report = DifficultyReport()
+        report._parameters = totals.tolist()
 
         end_time = perf_counter()
 
@@ -293,16 +626,9 @@ class DifficultyOptimizer:
     def get_fitness(self, difficulty: DifficultyReport):
         inv_fitness = 0
 
-        if self.target_difficulty.get_parameter(RoomParameter.ENEMY) != UNUSED_PARAMETER:
-            inv_fitness += abs(self.target_difficulty.get_parameter(RoomParameter.ENEMY) - difficulty.get_parameter(RoomParameter.ENEMY)) * 0.5
-
-        if self.target_difficulty.get_parameter(RoomParameter.JUMP) != UNUSED_PARAMETER:
-            inv_fitness += abs(self.target_difficulty.get_parameter(RoomParameter.JUMP) - difficulty.get_parameter(RoomParameter.JUMP)) * 0.75
-
-        if self.target_difficulty.get_parameter(RoomParameter.REWARD) != UNUSED_PARAMETER:
-            inv_fitness += abs(self.target_difficulty.get_parameter(RoomParameter.REWARD) - difficulty.get_parameter(RoomParameter.REWARD)) * 0.1
-
-        if self.target_difficulty.get_parameter(RoomParameter.SPRAWL) != UNUSED_PARAMETER:
-            inv_fitness += abs(self.target_difficulty.get_parameter(RoomParameter.SPRAWL) - difficulty.get_parameter(RoomParameter.SPRAWL)) * 0.75
+        for parameter in RoomParameter:
+            target = self.target_difficulty.get_parameter(parameter)
+            if target != UNUSED_PARAMETER:
+                inv_fitness += abs(target - difficulty.get_parameter(parameter)) * FITNESS_WEIGHTS.get_parameter(parameter)
 
         return 1 / inv_fitness if inv_fitness != 0 else inf
@@ -0,0 +1,44 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from ..generation.RoomParameter import RoomParameterCollection
+from .DifficultyReport import DifficultyReport
+
+
+@dataclass
+class DifficultySurrogate:
+    # Ridge regression from candidate parameters to the difficulty report, trained on evaluated candidates.
+    # It is only used to skip candidates that are unlikely to be selected, so it does not need to be accurate.
+    min_samples: int = 20
+    regularization: float = 1e-3
+
+    _features: list[list[float]] = field(default_factory=lambda: [])
+    _targets: list[list[float]] = field(default_factory=lambda: [])
+    _weights: np.ndarray | None = None
+
+    def add_sample(self, features: list[float], difficulty: RoomParameterCollection):
+        self._features.append([*features, 1])
+        self._targets.append(list(difficulty._parameters))
+        self._weights = None
+
+    def is_trained(self):
+        return len(self._features) >= self.min_samples
+
+    def _fit(self):
+        features = np.array(self._features)
+        targets = np.array(self._targets)
+        penalty = self.regularization * len(features) * np.eye(features.shape[1])
+        return np.linalg.solve(features.T @ features + penalty, features.T @ targets)
+
+    def predict(self, features: list[float]):
+        if not self.is_trained():
+            return None
+
+        if self._weights is None:
+            self._weights = self._fit()
+
+        prediction = np.array([*features, 1]) @ self._weights
+        report = DifficultyReport()
+        report._parameters = [max(float(value), 0) for value in prediction]
+        return report
@@ -0,0 +1,208 @@
+import os
+from dataclasses import dataclass, field
+from math import inf
+from multiprocessing.connection import Connection
+from random import Random
+from time import perf_counter
+from traceback import format_exc
+from typing import Any
+
+from ..game_core.Universe import Universe
+from ..generation.Requirements import Requirements
+from ..generation.RoomParameter import RoomParameterCollection
+from .DifficultyOptimizer import DifficultyOptimizer, EmptyPopulationError, LevelCandidate, TerminationReason
+from .DifficultyReport import DifficultyReport
+from .OptimizerWorker import OptimizerWorker
+
+
+@dataclass
+class _IslandConfig:
+    seed: float
+    target_difficulty: RoomParameterCollection
+    max_population: int
+    migration_size: int
+    options: dict[str, Any]
+    apply_reachability: bool
+
+
+@dataclass
+class IslandReport:
+    # The best candidate is None if every candidate of the island was rejected, migrants can still repopulate it
+    best_requirements: Requirements | None
+    best_override_seed: float | None
+    best_fitness: float
+    best_difficulty: DifficultyReport | None
+    # Best candidates of the island, sent to the next island in the ring
+    emigrants: list[tuple[Requirements, float | None]]
+    evaluation_count: int
+
+    def is_empty(self):
+        return self.best_difficulty is None
+
+    @staticmethod
+    def capture(optimizer: DifficultyOptimizer, migration_size: int):
+        if len(optimizer.valid_candidates) == 0:
+            return IslandReport(None, None, 0, None, [], optimizer.evaluation_count)
+
+        # Read from the population, get_best_candidate would regenerate and solve candidates without a map
+        _, best, best_fitness, best_difficulty = optimizer.valid_candidates[0]
+        return IslandReport(
+            best_requirements=best.requirements,
+            best_override_seed=best.override_seed,
+            best_fitness=best_fitness,
+            best_difficulty=best_difficulty,
+            emigrants=[(candidate[1].requirements, candidate[1].override_seed) for candidate in optimizer.valid_candidates[0:migration_size]],
+            evaluation_count=optimizer.evaluation_count,
+        )
+
+
+def _run_island(connection: Connection, config: _IslandConfig):
+    try:
+        OptimizerWorker.initialize(config.apply_reachability)
+
+        optimizer = DifficultyOptimizer(Universe(), config.target_difficulty, Random(config.seed), max_population=config.max_population, **config.options)
+        optimizer.initialize_population()
+        connection.send(IslandReport.capture(optimizer, config.migration_size))
+
+        while (message := connection.recv()) is not None:
+            generations, migrants = message
+            if len(migrants) > 0:
+                optimizer.add_migrants(migrants)
+
+            optimizer.max_generations = generations
+            optimizer.optimize()
+            connection.send(IslandReport.capture(optimizer, config.migration_size))
+    except Exception:
+        try:
+            connection.send(format_exc())
+        except OSError:
+            # The main process already stopped, because a different island failed first
+            pass
+    finally:
+        connection.close()
+
+
+@dataclass
+class IslandOptimizer:
+    # Runs independent populations in separate processes, after every migration interval the best candidates
+    # of each island replace the worst candidates of the next island in a ring
+    target_difficulty: RoomParameterCollection
+    random: Random
+    island_count: int = field(default_factory=lambda: os.cpu_count() or 1)
+    max_population: int = 10
+    max_generations: int = 5
+    migration_interval: int = 1
+    migration_size: int = 1
+    fitness_threshold: float = inf
+    time_budget: float | None = None
+    # Forwarded to the DifficultyOptimizer of each island, for example the elitism factor or a surrogate
+    options: dict[str, Any] = field(default_factory=lambda: {})
+
+    reports: list[IslandReport] = field(default_factory=lambda: [])
+    generation_count: int = 0
+    termination_reason: TerminationReason | None = None
+
+    def get_best_report(self):
+        reports = [report for report in self.reports if not report.is_empty()]
+        if len(reports) == 0:
+            raise EmptyPopulationError()
+        return max(reports, key=lambda v: v.best_fitness)
+
+    def get_best_fitness(self):
+        return self.get_best_report().best_fitness
+
+    def get_best_difficulty(self):
+        difficulty = self.get_best_report().best_difficulty
+        assert difficulty is not None
+        return difficulty
+
+    def get_evaluation_count(self):
+        return sum(report.evaluation_count for report in self.reports)
+
+    def get_best_candidate(self):
+        # Only the requirements are sent back from the islands
+        report = self.get_best_report()
+        assert report.best_requirements is not None and report.best_difficulty is not None
+        return LevelCandidate.restore_solved(report.best_requirements, report.best_override_seed, report.best_difficulty)
+
+    def _get_termination_reason(self, start_time: float):
+        # Empty islands are only repopulated by migrants from the other islands
+        if all(report.is_empty() for report in self.reports):
+            return TerminationReason.STALLED
+
+        best_fitness = self.get_best_fitness()
+        if best_fitness == inf:
+            return TerminationReason.TARGET_REACHED
+
+        if best_fitness >= self.fitness_threshold:
+            return TerminationReason.FITNESS_THRESHOLD
+
+        if self.time_budget is not None and perf_counter() - start_time >= self.time_budget:
+            return TerminationReason.TIME_BUDGET
+
+        if self.generation_count >= self.max_generations:
+            return TerminationReason.MAX_GENERATIONS
+
+        return None
+
+    @staticmethod
+    def _receive(connection: Connection):
+        message = connection.recv()
+        if isinstance(message, str):
+            raise RuntimeError(f"Island failed:\n{message}")
+        assert isinstance(message, IslandReport)
+        return message
+
+    def optimize(self):
+        start_time = perf_counter()
+        apply_reachability = OptimizerWorker.is_reachability_applied()
+        context = OptimizerWorker.get_context()
+
+        connections: list[Connection] = []
+        processes: list[Any] = []
+        for _ in range(self.island_count):
+            config = _IslandConfig(self.random.random(), self.target_difficulty, self.max_population, self.migration_size, self.options, apply_reachability)
+            connection, child_connection = context.Pipe()
+            process = context.Process(target=_run_island, args=(child_connection, config), daemon=True)
+            process.start()
+            child_connection.close()
+            connections.append(connection)
+            processes.append(process)
+
+        try:
+            self.reports = [self._receive(connection) for connection in connections]
+            self.generation_count = 0
+
+            while True:
+                self.termination_reason = self._get_termination_reason(start_time)
+                if self.termination_reason is not None:
+                    break
+
+                generations = min(self.migration_interval, self.max_generations - self.generation_count)
+                for index, connection in enumerate(connections):
+                    # The first interval starts from the initial populations, so the islands diverge before exchanging candidates
+                    migrants = self.reports[index - 1].emigrants if self.generation_count > 0 else []
+                    connection.send((generations, migrants))
+
+                self.reports = [self._receive(connection) for connection in connections]
+                self.generation_count += generations
+                print(f"Generation {self.generation_count}: island fitness {[f"{report.best_fitness:.4f}" if not report.is_empty() else "empty" for report in self.reports]}")
+        finally:
+            for connection in connections:
+                try:
+                    connection.send(None)
+                except OSError:
+                    pass
+                connection.close()
+
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+
+        end_time = perf_counter()
+        print(
+            f"Island optimization stopped after {self.generation_count} generations and {self.get_evaluation_count()} evaluations "
+            + f"in {(end_time - start_time) * 1000:.2f} ms: {self.termination_reason.value}"
+        )
+        return self.termination_reason
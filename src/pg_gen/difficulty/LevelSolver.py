@@ -3,12 +3,14 @@ from dataclasses import dataclass, field
 from functools import cached_property
 from itertools import chain, pairwise
 from time import perf_counter
+from typing import Literal
 
 from ..generation.Map import Map
 from ..generation.RoomInfo import NO_KEY, NOT_CONNECTED
 from ..support.Direction import Direction
 from ..support.keys import KEY_COLORS
 from ..support.Point import Point
+from ..support.Tracer import Tracer
 from .PathFinder import PathFinder
 
 
@@ -76,10 +78,29 @@ class LevelSolverState:
         return cloned_object
 
 
+class SolverBudgetExceeded(Exception):
+    def __init__(self, reason: Literal["expansions", "time"]):
+        super().__init__(f"Level solver exceeded its {reason} budget")
+        self.reason = reason
+
+
 @dataclass
 class LevelSolver:
     map: Map
     path_finder: PathFinder
+    # The number of orders of altars and key pickups to try can explode on some maps, these limits make solve
+    # raise SolverBudgetExceeded instead. The deadline is a perf_counter time.
+    max_expansions: int | None = None
+    deadline: float | None = None
+
+    expansions: int = field(default=0, init=False)
+
+    def _expand(self):
+        self.expansions += 1
+        if self.max_expansions is not None and self.expansions > self.max_expansions:
+            raise SolverBudgetExceeded("expansions")
+        if self.deadline is not None and perf_counter() > self.deadline:
+            raise SolverBudgetExceeded("time")
 
     @cached_property
     def key_locations(self):
@@ -100,7 +121,10 @@ class LevelSolver:
         assert portal is not None
         initial_state = LevelSolverState(position=self.map.room_list[0].position)
         solutions: list[LevelSolverState] = []
-        self.solve_permutation(initial_state, altars, portal, solutions)
+        self.expansions = 0
+        with Tracer.span("solve", "solver", rooms=len(self.map.room_list), altars=len(altars)) as span:
+            self.solve_permutation(initial_state, altars, portal, solutions)
+            span["solved"] = len(solutions) > 0
         if len(solutions) == 0:
             return None
 
@@ -134,6 +158,7 @@ class LevelSolver:
 
     def solve_path(self, state: LevelSolverState, end: Point, circular_dependency_prevention: set[int] | None = None):
         while state.position != end:
+            self._expand()
             path = self.path_finder.find_path(state.position, end, best_effort=False, can_traverse_locked_doors=True)
             assert path is not None
 
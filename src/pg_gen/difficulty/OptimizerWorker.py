@@ -0,0 +1,29 @@
+import multiprocessing
+import os
+import sys
+
+from ..generation.RoomPrefabRegistry import RoomPrefabRegistry
+from ..level_editor.ActorRegistry import ActorRegistry
+from .ReachabilityAnalyzer import ReachabilityAnalyzer
+
+
+class OptimizerWorker:
+    @staticmethod
+    def get_context():
+        # Workers are spawned on every platform, so they behave the same as on platforms without fork
+        return multiprocessing.get_context("spawn")
+
+    @staticmethod
+    def is_reachability_applied():
+        # Spawned workers do not inherit the registries, so they need to know if the main process applied reachability
+        return ReachabilityAnalyzer.is_applied_to_registry()
+
+    @staticmethod
+    def initialize(apply_reachability: bool):
+        # Workers run in parallel, their progress prints would only interleave
+        sys.stdout = open(os.devnull, "wt")
+
+        ActorRegistry.load_actors()
+        RoomPrefabRegistry.load()
+        if apply_reachability:
+            ReachabilityAnalyzer().apply_to_registry(analyze_missing=False)
@@ -0,0 +1,453 @@
+import json
+import re
+from dataclasses import dataclass, field
+from hashlib import sha256
+from itertools import combinations
+from math import copysign, floor
+from pathlib import Path
+from time import perf_counter
+
+from ..actors.progression.Climbable import Climbable
+from ..actors.progression.Door import Door
+from ..assets import get_pg_assets
+from ..game_core.Universe import Universe
+from ..generation.RoomInfo import NO_KEY, RoomInfo
+from ..generation.RoomParameter import RoomParameter
+from ..generation.RoomPrefab import ROOM_TRIGGERS, RoomPrefab, RoomPrefabEntrance
+from ..generation.RoomPrefabRegistry import RoomPrefabRegistry
+from ..support.constants import AIR_ACCELERATION, AIR_DRAG, GRAVITY, GROUND_VELOCITY, JUMP_IMPULSE, ROOM_HEIGHT, ROOM_WIDTH
+from ..support.Direction import Direction
+from ..support.Point import Point
+from ..support.resolve_intersection import is_intersection
+from ..support.Tracer import Tracer
+from ..world.CollisionFlags import CollisionFlags
+from ..world.World import World
+
+# Increment when the analysis changes so stale cache entries are ignored
+ANALYZER_VERSION = 1
+
+_CELL_SIZE = 0.5
+_MARGIN = 3
+_TIME_STEP = 1 / 60
+_MAX_FRAMES = 240
+_EPSILON = 1e-6
+
+# Where the player can appear after entering the room through the given entrance, mirrors RoomController.switch_rooms.
+# The position along the opening is kept from the previous room, so we use the first free one.
+_ENTRANCE_SPAWNS = {
+    Direction.LEFT: ([Point(0, y) for y in (3, 2.5, 2, 1.5, 1)], Point.ZERO),
+    Direction.RIGHT: ([Point(ROOM_WIDTH - 1, y) for y in (3, 2.5, 2, 1.5, 1)], Point.ZERO),
+    Direction.UP: ([Point(x, 0.5) for x in (9, 8.5, 9.5, 8, 10)], Point.ZERO),
+    Direction.DOWN: ([Point(x, ROOM_HEIGHT - 1.5) for x in (9, 8.5, 9.5, 8, 10)], Point(0, -JUMP_IMPULSE)),
+}
+
+# Horizontal input held during a jump and the frame at which it starts being held
+_JUMP_VARIANTS = [(0, 0), (-1, 0), (1, 0), (-1, 12), (1, 12)]
+
+_GROUP_REFERENCE = re.compile(r"@(\w+)")
+
+
+class _CollisionGrid:
+    def __init__(self):
+        self.columns = int((ROOM_WIDTH + _MARGIN * 2) / _CELL_SIZE)
+        self.rows = int((ROOM_HEIGHT + _MARGIN * 2) / _CELL_SIZE)
+        self.cells = bytearray(self.columns * self.rows)
+
+    def _to_cell(self, value: float):
+        return floor((value + _MARGIN) / _CELL_SIZE)
+
+    def add_rect(self, position: Point, size: Point):
+        if size.x < _EPSILON or size.y < _EPSILON:
+            return
+
+        for y in range(max(0, self._to_cell(position.y + _EPSILON)), min(self.rows, self._to_cell(position.y + size.y - _EPSILON) + 1)):
+            for x in range(max(0, self._to_cell(position.x + _EPSILON)), min(self.columns, self._to_cell(position.x + size.x - _EPSILON) + 1)):
+                self.cells[y * self.columns + x] = 1
+
+    def is_blocked(self, x: float, y: float):
+        # The player is always one tile in size
+        for cell_y in range(max(0, self._to_cell(y + _EPSILON)), min(self.rows, self._to_cell(y + 1 - _EPSILON) + 1)):
+            for cell_x in range(max(0, self._to_cell(x + _EPSILON)), min(self.columns, self._to_cell(x + 1 - _EPSILON) + 1)):
+                if self.cells[cell_y * self.columns + cell_x]:
+                    return True
+
+        return False
+
+    def is_supported(self, x: float, y: float):
+        return not self.is_blocked(x, y) and self.is_blocked(x, y + _CELL_SIZE)
+
+
+@dataclass
+class _RoomGeometry:
+    grid: _CollisionGrid
+    climbables: list[tuple[Point, Point, bool]]
+    exits: list[tuple[Direction, Point, Point]]
+
+
+@dataclass
+class _Trajectory:
+    exits: set[Direction] = field(default_factory=lambda: set())
+    climbables: set[int] = field(default_factory=lambda: set())
+    landing: tuple[float, float] | None = None
+
+
+type _Node = tuple[float, float] | int
+
+
+class _Explorer:
+    def __init__(self, geometry: _RoomGeometry):
+        self.geometry = geometry
+        self.grid = geometry.grid
+        self._successors: dict[_Node, tuple[set[Direction], list[_Node]]] = {}
+
+    def _touch(self, x: float, y: float, result: _Trajectory):
+        position = Point(x, y)
+        exited = False
+
+        for direction, exit_position, exit_size in self.geometry.exits:
+            if is_intersection(position, Point.ONE, exit_position, exit_size):
+                result.exits.add(direction)
+                exited = True
+
+        for i, (climbable_position, climbable_size, _) in enumerate(self.geometry.climbables):
+            if is_intersection(position, Point.ONE, climbable_position, climbable_size):
+                result.climbables.add(i)
+
+        return exited
+
+    def _snap_landing(self, x: float, y: float):
+        # Round to the grid so we do not create a separate node for every landing position
+        snapped = round(x / _CELL_SIZE) * _CELL_SIZE
+        for candidate in (snapped, snapped - _CELL_SIZE, snapped + _CELL_SIZE):
+            if abs(candidate - x) <= _CELL_SIZE and self.grid.is_supported(candidate, y):
+                return candidate, y
+        return x, y
+
+    def _simulate(self, x: float, y: float, velocity_x: float, velocity_y: float, move: int, move_delay: int, result: _Trajectory):
+        grid = self.grid
+
+        for frame in range(_MAX_FRAMES):
+            next_x = x + velocity_x * _TIME_STEP
+            if grid.is_blocked(next_x, y):
+                if velocity_x > 0:
+                    next_x = floor((next_x + 1 + _MARGIN) / _CELL_SIZE) * _CELL_SIZE - _MARGIN - 1
+                else:
+                    next_x = (floor((next_x + _MARGIN) / _CELL_SIZE) + 1) * _CELL_SIZE - _MARGIN
+                if grid.is_blocked(next_x, y):
+                    next_x = x
+            x = next_x
+
+            next_y = y + velocity_y * _TIME_STEP
+            landed = False
+            if grid.is_blocked(x, next_y):
+                if velocity_y > 0:
+                    next_y = floor((next_y + 1 + _MARGIN) / _CELL_SIZE) * _CELL_SIZE - _MARGIN - 1
+                    landed = True
+                else:
+                    next_y = (floor((next_y + _MARGIN) / _CELL_SIZE) + 1) * _CELL_SIZE - _MARGIN
+                    velocity_y = 0
+                if grid.is_blocked(x, next_y):
+                    next_y = y
+            y = next_y
+
+            if self._touch(x, y, result):
+                # The room is switched as soon as the player touches a room trigger
+                return
+
+            if landed and grid.is_supported(x, y):
+                result.landing = self._snap_landing(x, y)
+                return
+
+            if y > ROOM_HEIGHT + _MARGIN or y < -_MARGIN or x < -_MARGIN or x > ROOM_WIDTH + _MARGIN:
+                return
+
+            drag = min(AIR_DRAG * _TIME_STEP, abs(velocity_x))
+            velocity_x -= copysign(drag, velocity_x)
+            velocity_y += GRAVITY * _TIME_STEP
+
+            if frame >= move_delay:
+                velocity_x += move * AIR_ACCELERATION * _TIME_STEP
+
+            if abs(velocity_x) > GROUND_VELOCITY:
+                velocity_x = copysign(GROUND_VELOCITY, velocity_x)
+
+    def _get_successors(self, node: _Node):
+        existing = self._successors.get(node)
+        if existing is not None:
+            return existing
+
+        result = _Trajectory()
+        landings: list[tuple[float, float]] = []
+
+        def simulate(x: float, y: float, velocity_x: float, velocity_y: float, move: int, move_delay: int):
+            self._simulate(x, y, velocity_x, velocity_y, move, move_delay, result)
+            if result.landing is not None:
+                landings.append(result.landing)
+                result.landing = None
+
+        if isinstance(node, int):
+            position, size, slide_only = self.geometry.climbables[node]
+            x = position.x
+            top = position.y - 1
+            bottom = position.y + size.y - 1
+
+            y = top
+            while y <= bottom + _EPSILON:
+                if not self.grid.is_blocked(x, y):
+                    self._touch(x, y, result)
+                    if self.grid.is_supported(x, y):
+                        landings.append((x, y))
+                    for move in (-1, 0, 1):
+                        simulate(x, y, move * GROUND_VELOCITY, -JUMP_IMPULSE, move, 0)
+                y += _CELL_SIZE
+
+            if not slide_only:
+                # Climbing past the top of the climbable releases the player
+                simulate(x, top - 0.01, 0, 0, 0, 0)
+        else:
+            x, y = node
+            self._touch(x, y, result)
+
+            for move in (-1, 1):
+                next_x = x + move * _CELL_SIZE
+                next_y = y
+                if self.grid.is_blocked(next_x, next_y):
+                    # Slopes are rasterized into steps, allow walking up one step
+                    next_y -= _CELL_SIZE
+                    if self.grid.is_blocked(next_x, next_y):
+                        continue
+
+                if self.grid.is_supported(next_x, next_y):
+                    self._touch(next_x, next_y, result)
+                    landings.append((next_x, next_y))
+                else:
+                    simulate(next_x, next_y, move * GROUND_VELOCITY, 0, move, 0)
+
+            for move, delay in _JUMP_VARIANTS:
+                simulate(x, y, move * GROUND_VELOCITY if delay == 0 else 0, -JUMP_IMPULSE, move, delay)
+
+        successors = (result.exits, [*result.climbables, *landings])
+        self._successors[node] = successors
+        return successors
+
+    def explore(self, entrance: Direction):
+        positions, velocity = _ENTRANCE_SPAWNS[entrance]
+        position = next((x for x in positions if not self.grid.is_blocked(x.x, x.y)), None)
+        if position is None:
+            return set[Direction]()
+
+        start = _Trajectory()
+        self._simulate(position.x, position.y, velocity.x, velocity.y, 0, 0, start)
+        exits = set(start.exits)
+
+        open_nodes: list[_Node] = [*start.climbables]
+        if start.landing is not None:
+            open_nodes.append(start.landing)
+        visited = set(open_nodes)
+
+        while len(open_nodes) > 0:
+            node = open_nodes.pop()
+            node_exits, next_nodes = self._get_successors(node)
+            exits |= node_exits
+
+            for next_node in next_nodes:
+                if next_node in visited:
+                    continue
+                visited.add(next_node)
+                open_nodes.append(next_node)
+
+        # Leaving through the opening we came from does not count
+        exits.discard(entrance)
+        return exits
+
+
+@dataclass
+class RoomReachability:
+    # For each set of connected entrances, the (entrance, exit) pairs the player can traverse
+    routes: dict[frozenset[Direction], set[tuple[Direction, Direction]]] = field(default_factory=lambda: {})
+
+    def is_traversable(self, connected: frozenset[Direction]):
+        routes = self.routes.get(connected)
+        if routes is None:
+            # Not analyzed, assume the room is fine like the level solver does
+            return True
+
+        return all((entrance, exit) in routes for entrance in connected for exit in connected if entrance != exit)
+
+    def serialize(self):
+        return {
+            ",".join(direction.name for direction in sorted(connected)): sorted([entrance.name, exit.name] for entrance, exit in routes)
+            for connected, routes in self.routes.items()
+        }
+
+    @staticmethod
+    def deserialize(data: dict[str, list[list[str]]]):
+        return RoomReachability(
+            routes={
+                frozenset(Direction[name] for name in key.split(",") if name != ""): set((Direction[entrance], Direction[exit]) for entrance, exit in routes)
+                for key, routes in data.items()
+            }
+        )
+
+
+@dataclass
+class ReachabilityAnalyzer:
+    # Sockets are random and depend on room parameters, a route is considered possible if it exists in any sample
+    seeds: list[float] = field(default_factory=lambda: [0.25, 0.75])
+    parameter_values: list[float] = field(default_factory=lambda: [0.0, 1.0])
+
+    cache_path: Path = field(default_factory=lambda: Path(str(get_pg_assets().local)) / "reachability.json")
+    _cache: dict[str, dict] | None = field(default=None, init=False)
+    _cache_dirty: bool = field(default=False, init=False)
+
+    @staticmethod
+    def get_prefab_hash(prefab: RoomPrefab):
+        # Nested rooms selected by sockets also affect the geometry, so include every prefab we can reference
+        hash = sha256(f"{ANALYZER_VERSION}:{prefab.name}".encode())
+        visited_groups: set[str] = set()
+        pending = [prefab]
+        visited_prefabs = {prefab.name}
+
+        while len(pending) > 0:
+            current = pending.pop(0)
+            data = current.get_data()
+            hash.update(data.encode())
+
+            for group in sorted(set(_GROUP_REFERENCE.findall(data)) - visited_groups):
+                visited_groups.add(group)
+                for nested in RoomPrefabRegistry.rooms_by_group.get(group, []):
+                    if nested.name in visited_prefabs:
+                        continue
+                    visited_prefabs.add(nested.name)
+                    pending.append(nested)
+
+        return hash.hexdigest()
+
+    @staticmethod
+    def get_connection_combinations(prefab: RoomPrefab):
+        optional: list[Direction] = []
+        required: list[Direction] = []
+
+        for direction in Direction.get_directions():
+            entrance = prefab.get_connection(direction)
+            if entrance == RoomPrefabEntrance.DOOR or entrance == RoomPrefabEntrance.OPEN:
+                required.append(direction)
+            elif entrance != RoomPrefabEntrance.CLOSED:
+                optional.append(direction)
+
+        for count in range(len(optional) + 1):
+            for selected in combinations(optional, count):
+                connected = frozenset((*required, *selected))
+                # A room with a single entrance has nothing to traverse
+                if len(connected) >= 2:
+                    yield connected
+
+    def _build_geometry(self, prefab: RoomPrefab, connected: frozenset[Direction], seed: float, parameter_value: float, locked: bool):
+        room = RoomInfo(seed, Point.ZERO, 0, prefab)
+        for direction in connected:
+            room.set_connection(direction, 1 if locked else NO_KEY)
+        for parameter in RoomParameter:
+            room.set_parameter(parameter, parameter_value)
+
+        world = World(Universe())
+        prefab.instantiate_root(room, None, world)
+
+        grid = _CollisionGrid()
+        climbables: list[tuple[Point, Point, bool]] = []
+
+        for actor in world.get_actors():
+            if isinstance(actor, Climbable):
+                climbables.append((actor.position, actor.size, actor.slide_only))
+                continue
+
+            # Locked doors are not obstacles, the level solver makes sure the key is collected first
+            if isinstance(actor, Door) or CollisionFlags.STATIC not in actor.collision_flags:
+                continue
+
+            for position, size in actor.get_colliders():
+                grid.add_rect(position, size)
+
+        exits = [(direction, position, size) for direction, position, size in ROOM_TRIGGERS if direction in connected]
+        return _RoomGeometry(grid, climbables, exits)
+
+    def analyze_connections(self, prefab: RoomPrefab, connected: frozenset[Direction]):
+        routes: set[tuple[Direction, Direction]] = set()
+
+        for seed in self.seeds:
+            for parameter_value in self.parameter_values:
+                for locked in (False, True):
+                    explorer = _Explorer(self._build_geometry(prefab, connected, seed, parameter_value, locked))
+                    for entrance in connected:
+                        for exit in explorer.explore(entrance):
+                            routes.add((entrance, exit))
+
+        return routes
+
+    def analyze_prefab(self, prefab: RoomPrefab):
+        reachability = RoomReachability()
+        for connected in self.get_connection_combinations(prefab):
+            reachability.routes[connected] = self.analyze_connections(prefab, connected)
+        return reachability
+
+    def _load_cache(self):
+        if self._cache is not None:
+            return self._cache
+
+        cache: dict[str, dict] = {}
+        if self.cache_path.exists():
+            try:
+                data = json.loads(self.cache_path.read_text())
+                if data.get("version") == ANALYZER_VERSION:
+                    cache = data["rooms"]
+            except (ValueError, KeyError):
+                print(f"Ignoring invalid reachability cache {self.cache_path}")
+
+        self._cache = cache
+        return cache
+
+    def save_cache(self):
+        if not self._cache_dirty or self._cache is None:
+            return
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self.cache_path.write_text(json.dumps({"version": ANALYZER_VERSION, "rooms": self._cache}, indent=4, sort_keys=True) + "\n")
+        self._cache_dirty = False
+
+    def get_reachability(self, prefab: RoomPrefab, analyze_missing=True):
+        cache = self._load_cache()
+        prefab_hash = self.get_prefab_hash(prefab)
+
+        cached = cache.get(prefab_hash)
+        if cached is not None:
+            Tracer.count("reachability_cache_hits")
+            return RoomReachability.deserialize(cached)
+
+        Tracer.count("reachability_cache_misses")
+
+        if not analyze_missing:
+            return None
+
+        start = perf_counter()
+        reachability = self.analyze_prefab(prefab)
+        end = perf_counter()
+        print(f"Analyzed reachability of room {prefab.name} in {(end - start) * 1000:.2f} ms")
+
+        cache[prefab_hash] = reachability.serialize()
+        self._cache_dirty = True
+        return reachability
+
+    def apply_to_registry(self, analyze_missing=True):
+        for prefab in RoomPrefabRegistry.get_prefabs():
+            prefab.reachability = self.get_reachability(prefab, analyze_missing)
+
+        self.save_cache()
+
+    @staticmethod
+    def remove_from_registry():
+        for prefab in RoomPrefabRegistry.get_prefabs():
+            prefab.reachability = None
+
+    @staticmethod
+    def is_applied_to_registry():
+        # Rejecting untraversable rooms changes which prefabs are selected, so maps only match if both sides agree on this
+        return any(prefab.reachability is not None for prefab in RoomPrefabRegistry.get_prefabs())
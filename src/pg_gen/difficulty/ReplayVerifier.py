@@ -0,0 +1,89 @@
+from dataclasses import dataclass
+
+from ..actors.Player import Player
+from ..game_core.InputRecording import InputRecording
+from ..game_core.ReplayGameLoop import ReplayGameLoop
+from ..game_core.Universe import Universe
+from ..generation.RoomController import RoomController
+from ..support.constants import ROOM_HEIGHT, ROOM_WIDTH
+from ..support.Point import Point
+from .DifficultyOptimizer import LevelCandidate
+from .ReachabilityAnalyzer import ReachabilityAnalyzer
+
+_POSITION_TOLERANCE = 1e-6
+
+
+@dataclass
+class ReplayResult:
+    frame_count: int
+    room: Point | None
+    position: Point | None
+    score: int
+    finished: bool
+
+    @staticmethod
+    def capture(universe: Universe, frame_count: int, finished: bool):
+        player = universe.di.try_inject(Player)
+        world = universe.world
+        room_controller = next((x for x in world.get_actors() if isinstance(x, RoomController)), None) if world is not None else None
+
+        return ReplayResult(
+            frame_count=frame_count,
+            room=room_controller.room.position if room_controller is not None and room_controller.room is not None else None,
+            position=player.position if player is not None else None,
+            score=player.score if player is not None else 0,
+            finished=finished,
+        )
+
+    def store_into(self, recording: InputRecording):
+        recording.final_room = self.room
+        recording.final_position = self.position
+        recording.final_score = self.score
+        recording.finished = self.finished
+
+
+class ReplayVerifier:
+    @staticmethod
+    def replay(recording: InputRecording):
+        assert recording.requirements is not None, "Recording does not contain the level requirements"
+
+        # Uses the same cached analysis as the interactive demo, which does not analyze missing rooms either
+        if recording.reachability_applied and not ReachabilityAnalyzer.is_applied_to_registry():
+            ReachabilityAnalyzer().apply_to_registry(analyze_missing=False)
+        elif not recording.reachability_applied and ReachabilityAnalyzer.is_applied_to_registry():
+            ReachabilityAnalyzer.remove_from_registry()
+
+        universe = Universe()
+        map = LevelCandidate.restore(recording.requirements, recording.override_seed).get_map()
+        universe.map = map
+
+        room_controller = RoomController.initialize_and_activate(universe, map.get_room(Point.ZERO), None)
+        room_controller.world.add_actor(Player(position=Point(ROOM_WIDTH / 2, ROOM_HEIGHT / 2)))
+
+        game_loop = ReplayGameLoop(universe)
+        frame_count = game_loop.run(recording)
+
+        return ReplayResult.capture(universe, frame_count, game_loop.game_over_reached)
+
+    @staticmethod
+    def verify(recording: InputRecording):
+        result = ReplayVerifier.replay(recording)
+        errors: list[str] = []
+
+        if result.frame_count != len(recording.frames):
+            errors.append(f"Replay ended after {result.frame_count} frames, expected {len(recording.frames)}")
+
+        if result.finished != recording.finished:
+            errors.append(f"Expected finished to be {recording.finished}, got {result.finished}")
+
+        if result.score != recording.final_score:
+            errors.append(f"Expected score {recording.final_score}, got {result.score}")
+
+        if result.room != recording.final_room:
+            errors.append(f"Expected to end in room {recording.final_room}, got {result.room}")
+
+        if recording.final_position is not None:
+            if result.position is None or Point.distance(result.position, recording.final_position) > _POSITION_TOLERANCE:
+                errors.append(f"Expected final position {recording.final_position}, got {result.position}")
+
+        return result, errors
@@ -0,0 +1,177 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from math import inf
+from random import Random
+from time import perf_counter
+
+from ..game_core.Universe import Universe
+from ..generation.MapGenerator import GenerationStage
+from ..generation.Requirements import Requirements
+from ..support.Tracer import Tracer
+from .DifficultyOptimizer import DifficultyOptimizer, LevelCandidate, RejectionReason, TerminationReason
+from .DifficultyReport import DifficultyReport
+from .OptimizerWorker import OptimizerWorker
+
+# Attempts at breeding a child that was not evaluated yet, before waiting for more results
+_BREEDING_ATTEMPTS = 10
+
+_evaluator: DifficultyOptimizer | None = None
+
+
+def _initialize_evaluator(apply_reachability: bool, solver_expansion_budget: int | None, candidate_time_budget: float | None):
+    global _evaluator
+    OptimizerWorker.initialize(apply_reachability)
+    # Workers only calculate the difficulty, the fitness is calculated by the main process
+    _evaluator = DifficultyOptimizer(
+        Universe(),
+        DifficultyReport(),
+        Random(0),
+        solver_expansion_budget=solver_expansion_budget,
+        candidate_time_budget=candidate_time_budget,
+    )
+
+
+def _evaluate(requirements: Requirements, override_seed: float | None) -> tuple[DifficultyReport | None, RejectionReason | None]:
+    assert _evaluator is not None
+    candidate = LevelCandidate.restore(requirements, override_seed, GenerationStage.KEYS)
+    evaluation = _evaluator.solve_candidate(candidate)
+    if evaluation is None:
+        return None, candidate.rejection_reason
+    return evaluation[1].difficulty, None
+
+
+@dataclass
+class SteadyStateOptimizer:
+    # Evaluates candidates in worker processes and inserts every result into the ranked population as soon as it
+    # arrives, after which a new child is bred from the current population. A slow candidate only occupies its own
+    # worker instead of stalling a whole generation. Selection, mutation and the stopping criteria are taken from
+    # the optimizer, without an evaluation budget the run evaluates as many candidates as the generational one.
+    optimizer: DifficultyOptimizer
+    worker_count: int = field(default_factory=lambda: os.cpu_count() or 1)
+
+    _pending: dict[Future[tuple[DifficultyReport | None, RejectionReason | None]], tuple[Requirements, float | None]] = field(default_factory=lambda: {})
+    _pending_keys: set[tuple] = field(default_factory=lambda: set())
+    _random_children: int = 0
+
+    def get_evaluation_budget(self):
+        optimizer = self.optimizer
+        if optimizer.evaluation_budget is not None:
+            return optimizer.evaluation_budget
+        return optimizer.max_population * (optimizer.max_generations + 1)
+
+    def _create_child(self):
+        optimizer = self.optimizer
+
+        # The initial population is random, breeding starts as soon as the first results arrive
+        if self._random_children < optimizer.max_population:
+            self._random_children += 1
+            return optimizer.create_random_requirements(), None
+
+        if len(optimizer.valid_candidates) == 0:
+            return None
+
+        selection_candidates = optimizer.valid_candidates[0 : max(1, int(len(optimizer.valid_candidates) * optimizer.selection_factor))]
+        cutoff_fitness = selection_candidates[-1][2]
+        surrogate_rejections = 0
+        for _ in range(_BREEDING_ATTEMPTS):
+            requirements, before_altars, override_seed = optimizer.breed_child(selection_candidates)
+
+            if before_altars is None and surrogate_rejections < optimizer.surrogate_rejection_limit and optimizer.is_rejected_by_surrogate(requirements, cutoff_fitness):
+                surrogate_rejections += 1
+                optimizer.surrogate_rejection_count += 1
+                Tracer.count("surrogate_rejections")
+                continue
+
+            key = (requirements.get_key(), override_seed)
+            if key in optimizer.evaluations or key in self._pending_keys:
+                Tracer.count("evaluation_cache_hits")
+                continue
+
+            return requirements, override_seed
+
+        return None
+
+    def _get_termination_reason(self, start_time: float):
+        optimizer = self.optimizer
+        best_fitness = optimizer.get_best_fitness() if len(optimizer.valid_candidates) > 0 else 0
+        if best_fitness == inf:
+            return TerminationReason.TARGET_REACHED
+
+        if best_fitness >= optimizer.fitness_threshold:
+            return TerminationReason.FITNESS_THRESHOLD
+
+        if optimizer.time_budget is not None and perf_counter() - start_time >= optimizer.time_budget:
+            return TerminationReason.TIME_BUDGET
+
+        if optimizer.evaluation_count >= self.get_evaluation_budget():
+            return TerminationReason.EVALUATION_BUDGET
+
+        return None
+
+    def _submit_children(self, executor: ProcessPoolExecutor):
+        # More tasks than workers are queued, so a worker does not wait for the main process between candidates
+        budget = self.get_evaluation_budget()
+        while len(self._pending) < self.worker_count * 2 and self.optimizer.evaluation_count + len(self._pending) < budget:
+            child = self._create_child()
+            if child is None:
+                return
+
+            requirements, override_seed = child
+            future = executor.submit(_evaluate, requirements, override_seed)
+            self._pending[future] = child
+            self._pending_keys.add((requirements.get_key(), override_seed))
+
+    def _collect_result(self, future: Future[tuple[DifficultyReport | None, RejectionReason | None]]):
+        requirements, override_seed = self._pending.pop(future)
+        self._pending_keys.remove((requirements.get_key(), override_seed))
+
+        self.optimizer.evaluation_count += 1
+        Tracer.count("evaluated_candidates")
+        difficulty, rejection_reason = future.result()
+        return self.optimizer.insert_evaluation(requirements, override_seed, difficulty, rejection_reason)
+
+    def optimize(self):
+        start_time = perf_counter()
+        optimizer = self.optimizer
+        optimizer.valid_candidates.clear()
+        self._random_children = 0
+
+        executor = ProcessPoolExecutor(
+            self.worker_count,
+            mp_context=OptimizerWorker.get_context(),
+            initializer=_initialize_evaluator,
+            initargs=(OptimizerWorker.is_reachability_applied(), optimizer.solver_expansion_budget, optimizer.candidate_time_budget),
+        )
+
+        try:
+            while True:
+                optimizer.termination_reason = self._get_termination_reason(start_time)
+                if optimizer.termination_reason is not None:
+                    break
+
+                self._submit_children(executor)
+                if len(self._pending) == 0:
+                    # Every child bred from the population was already evaluated
+                    optimizer.termination_reason = TerminationReason.STALLED
+                    break
+
+                done, _ = wait(self._pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self._collect_result(future)
+        finally:
+            # Candidates still being evaluated are abandoned, their workers exit once they finish
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._pending.clear()
+            self._pending_keys.clear()
+
+        if len(optimizer.valid_candidates) > 0:
+            # Candidates from the workers do not have maps, the best one is generated again so it can be played
+            optimizer.get_best_candidate()
+
+        end_time = perf_counter()
+        print(
+            f"Steady-state optimization stopped after {optimizer.evaluation_count} evaluations "
+            + f"in {(end_time - start_time) * 1000:.2f} ms: {optimizer.termination_reason.value}"
+        )
+        return optimizer.termination_reason
@@ -8,7 +8,6 @@ from pygame import Surface
 from ..support.Color import Color
 from ..support.constants import CAMERA_SCALE
 from ..support.Point import Point
-from ..world.Actor import Actor
 from .Texture import Texture
 
 
@@ -74,8 +73,11 @@ class Camera:
     def draw_texture(self, position: Point, size: Point, texture: Texture, color: Color = Color.WHITE, repeat=Point.ONE, rotate=0.0, flip_x=False):
         self.draw_texture_raw(self.world_to_screen(position), size * self.zoom, texture, color, repeat, rotate, flip_x)
 
+    def draw_surface_bands(self, position: Point, surface: Surface, colors: list[Color]):
+        # Tints the surface in horizontal bands, one per color, then draws it at a screen position
+        size = Point(*surface.get_size())
+        splits = len(colors)
+        for y, color in enumerate(colors):
+            surface.fill(color.to_pygame_color(), (size.down() * y / splits).to_pygame_rect(size * Point(1, 1 / splits)), pygame.BLEND_RGB_MULT)
 
-class CameraClient(Actor):
-    @cached_property
-    def _camera(self):
-        return self.universe.di.inject(Camera)
+        self.screen.blit(surface, position.to_pygame_coordinates())
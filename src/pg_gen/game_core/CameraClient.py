@@ -0,0 +1,12 @@
+from functools import cached_property
+
+from ..world.Actor import Actor
+
+
+class CameraClient(Actor):
+    # Rendering modules depend on pygame, they are only imported once an actor is actually drawn
+    @cached_property
+    def _camera(self):
+        from .Camera import Camera
+
+        return self.universe.di.inject(Camera)
@@ -0,0 +1,69 @@
+import json
+import zlib
+from base64 import b64decode, b64encode
+from dataclasses import dataclass, field
+from typing import Any
+
+from ..generation.Requirements import Requirements
+from ..support.Point import Point
+from .InputState import InputState
+
+
+@dataclass
+class InputRecording:
+    delta_time: float = 1 / 60
+    frames: bytearray = field(default_factory=lambda: bytearray(), repr=False)
+
+    requirements: Requirements | None = None
+    override_seed: float | None = None
+    # Maps generated with reachability filtering differ, so the replay has to use the same setting
+    reachability_applied: bool = False
+
+    final_room: Point | None = None
+    final_position: Point | None = None
+    final_score: int = 0
+    finished: bool = False
+
+    def record_frame(self, input: InputState):
+        self.frames.append(input.get_mask())
+
+    def serialize(self):
+        data: dict[str, Any] = {
+            "delta_time": self.delta_time,
+            # Each frame is a single byte input mask, consecutive frames are mostly the same so they compress really well
+            "frames": b64encode(zlib.compress(bytes(self.frames), level=9)).decode("ascii"),
+            "requirements": self.requirements.serialize() if self.requirements is not None else None,
+            "override_seed": self.override_seed,
+            "reachability_applied": self.reachability_applied,
+            "final_room": self.final_room.serialize() if self.final_room is not None else None,
+            "final_position": self.final_position.serialize() if self.final_position is not None else None,
+            "final_score": self.final_score,
+            "finished": self.finished,
+        }
+
+        return json.dumps(data, indent=4, sort_keys=True) + "\n"
+
+    @staticmethod
+    def deserialize(raw_data: str):
+        data = json.loads(raw_data)
+
+        return InputRecording(
+            delta_time=data["delta_time"],
+            frames=bytearray(zlib.decompress(b64decode(data["frames"]))),
+            requirements=Requirements.deserialize(data["requirements"]) if data["requirements"] is not None else None,
+            override_seed=data["override_seed"],
+            reachability_applied=data.get("reachability_applied", False),
+            final_room=Point.deserialize(data["final_room"]) if data["final_room"] is not None else None,
+            final_position=Point.deserialize(data["final_position"]) if data["final_position"] is not None else None,
+            final_score=data["final_score"],
+            finished=data["finished"],
+        )
+
+    def save(self, file_path: str):
+        with open(file_path, "wt") as file:
+            file.write(self.serialize())
+
+    @staticmethod
+    def load(file_path: str):
+        with open(file_path, "rt") as file:
+            return InputRecording.deserialize(file.read())
@@ -1,4 +1,9 @@
-import pygame
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pygame
+
+_MASK_FIELDS = ["left", "right", "jump", "up", "down"]
 
 
 class InputState:
@@ -8,7 +13,7 @@ class InputState:
     up = False
     down = False
 
-    keys: pygame.key.ScancodeWrapper = None  # type: ignore
+    keys: "pygame.key.ScancodeWrapper" = None  # type: ignore
 
     __singleton_service__ = True
 
@@ -20,6 +25,17 @@ class InputState:
         self.up = False
         self.down = False
 
+    def get_mask(self):
+        mask = 0
+        for i, name in enumerate(_MASK_FIELDS):
+            if getattr(self, name):
+                mask |= 1 << i
+        return mask
+
+    def set_mask(self, mask: int):
+        for i, name in enumerate(_MASK_FIELDS):
+            setattr(self, name, mask & (1 << i) != 0)
+
     def __init__(self) -> None:
-        self.events: list[pygame.event.Event] = []
+        self.events: "list[pygame.event.Event]" = []
         pass
@@ -5,7 +5,9 @@ from typing import TYPE_CHECKING, override
 import pygame
 
 from ..support.constants import CAMERA_SCALE, ROOM_HEIGHT, ROOM_WIDTH
+from ..support.StartupProfiler import StartupProfiler
 from .GameLoop import GameLoop
+from .InputRecording import InputRecording
 from .InputState import InputState
 
 if TYPE_CHECKING:
@@ -17,12 +19,20 @@ class InteractiveGameLoop(GameLoop):
     allow_termination = True
     disable_input_clearing = False
     game_over_reached = False
+    recording: InputRecording | None = None
 
     @override
     def game_over(self):
         self.game_over_reached = True
 
     def run(self):
+        with StartupProfiler.phase("First frame"):
+            should_terminate = self.run_frame()
+        # Startup is over once the first frame is shown
+        StartupProfiler.report()
+        if should_terminate:
+            return
+
         while True:
             should_terminate = self.run_frame()
             if should_terminate:
@@ -66,18 +76,28 @@ class InteractiveGameLoop(GameLoop):
         return delta_time
 
     def run_frame(self):
+        frame_start = time.perf_counter()
         should_terminate = self.handle_input()
         if should_terminate:
             return True
 
-        self.update_and_render(self.update_time())
+        delta_time = self.update_time()
+        if self.recording is not None:
+            # Recorded frames are replayed with a fixed time step, so we have to simulate them the same way
+            self.recording.record_frame(self.input)
+            delta_time = self.recording.delta_time
+
+        self.update_and_render(delta_time)
         pygame.display.update()
+        # Use the rest of the frame for background work, like preparing rooms the player may enter next
+        self.universe.execute_idle_tasks(frame_start + 1 / 60)
         self.fps_keeper.tick(60)
 
         return False
 
     def __init__(self, universe: "Universe"):
-        surface = pygame.display.set_mode((CAMERA_SCALE * ROOM_WIDTH, CAMERA_SCALE * ROOM_HEIGHT))
+        with StartupProfiler.phase("Display initialization"):
+            surface = pygame.display.set_mode((CAMERA_SCALE * ROOM_WIDTH, CAMERA_SCALE * ROOM_HEIGHT))
         super().__init__(surface, universe)
         self.fps_keeper = pygame.time.Clock()
 
@@ -0,0 +1,36 @@
+from typing import TYPE_CHECKING, override
+
+from pygame import Surface
+
+from .GameLoop import GameLoop
+from .InputRecording import InputRecording
+from .InputState import InputState
+
+if TYPE_CHECKING:
+    from .Universe import Universe
+
+
+class ReplayGameLoop(GameLoop):
+    game_over_reached = False
+
+    @override
+    def game_over(self):
+        self.game_over_reached = True
+
+    def run(self, recording: InputRecording):
+        # Frames are never rendered, we only need to run the logic and the tasks it queues
+        for frame, mask in enumerate(recording.frames):
+            self.input.clear()
+            self.input.set_mask(mask)
+            self.update_logic(recording.delta_time)
+            self.universe.execute_pending_tasks()
+
+            if self.game_over_reached:
+                return frame + 1
+
+        return len(recording.frames)
+
+    def __init__(self, universe: "Universe"):
+        super().__init__(Surface((1, 1)), universe)
+        self.input = self.universe.di.inject(InputState)
+        pass
@@ -1,10 +1,12 @@
 from functools import cached_property
 
 from ..world.Actor import Actor
-from .ResourceProvider import ResourceProvider
 
 
 class ResourceClient(Actor):
+    # Resources are loaded using pygame, which is only imported once an actor actually needs them
     @cached_property
     def _resource_provider(self):
+        from .ResourceProvider import ResourceProvider
+
         return self.universe.di.inject(ResourceProvider)
@@ -3,6 +3,7 @@ import pygame.freetype
 
 from ..assets import get_pg_assets
 from ..support.Point import Point
+from ..support.StartupProfiler import StartupProfiler
 from .Texture import Texture
 
 
@@ -10,12 +11,14 @@ class ResourceProvider:
     def __init__(self) -> None:
         assets = get_pg_assets()
 
-        self.font = pygame.freetype.SysFont("Arial", 12)
-        self.display_font = pygame.freetype.Font(str(assets.font), 120)
+        with StartupProfiler.phase("Font loading"):
+            self.font = pygame.freetype.SysFont("Arial", 12)
+            self.display_font = pygame.freetype.Font(str(assets.font), 120)
 
-        spritesheet = Texture(
-            pygame.image.load(str(assets.spritesheet)).convert_alpha(),
-        )
+        with StartupProfiler.phase("Spritesheet loading"):
+            spritesheet = Texture(
+                pygame.image.load(str(assets.spritesheet)).convert_alpha(),
+            )
 
         self.key_sprite = spritesheet.slice(Point(32, 0), Point(16, 16))
         self.door_sprite = spritesheet.slice(Point(0, 0), Point(32, 32))
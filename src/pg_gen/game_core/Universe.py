@@ -1,3 +1,4 @@
+from time import perf_counter
 from typing import TYPE_CHECKING, Callable
 
 if TYPE_CHECKING:
@@ -42,6 +43,19 @@ class Universe:
             for task in tasks:
                 task()
 
+    def execute_idle_tasks(self, deadline: float):
+        # Idle tasks get the time until which they can run and return True once they are finished
+        for task in list(self._idle_tasks):
+            if perf_counter() >= deadline:
+                return
+
+            if task(deadline):
+                self._idle_tasks.remove(task)
+
+    def queue_idle_task(self, task: Callable[[float], bool]):
+        if task not in self._idle_tasks:
+            self._idle_tasks.append(task)
+
     def register_service_actor(self, actor: "ServiceActor"):
         self._service_actors.append(actor)
 
@@ -51,5 +65,6 @@ class Universe:
     def __init__(self):
         self.di = DependencyInjection()
         self._pending_tasks: list[Callable[[], None]] = []
+        self._idle_tasks: list[Callable[[float], bool]] = []
         self._service_actors: list["ServiceActor"] = []
         pass
@@ -1,3 +1,4 @@
+import hashlib
 from copy import copy
 from dataclasses import dataclass, field
 
@@ -72,6 +73,14 @@ class Map:
         self.areas[id] = area
         return area
 
+    def get_hash(self):
+        # Identifies the generated level, rooms with the same prefab, seed and parameters instantiate the same
+        map_hash = hashlib.sha1()
+        for room in self.room_list:
+            prefab_name = room.prefab.name if room.prefab is not None else ""
+            map_hash.update(f"{room.position.x},{room.position.y}\0{prefab_name}\0{room.seed}\0{room.pickup_type}\0{room._connections}\0{room._parameters}\n".encode())
+        return map_hash.hexdigest()
+
     def clone(self):
         room_list = [room.clone() for room in self.room_list]
         rooms = {room.position: room for room in room_list}
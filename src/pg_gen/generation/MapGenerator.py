@@ -5,6 +5,7 @@ from time import perf_counter
 
 from ..support.keys import KEY_COLORS
 from ..support.Point import Point
+from ..support.Tracer import Tracer
 from .AreaInfo import AreaInfo
 from .Map import Map
 from .Requirements import Requirements
@@ -184,16 +185,20 @@ class MapGenerator:
         start = perf_counter()
 
         if target_stage >= GenerationStage.LAYOUT and self.stage < GenerationStage.LAYOUT:
-            self.generate_layout()
+            with Tracer.span("LAYOUT", "generation"):
+                self.generate_layout()
 
         if target_stage >= GenerationStage.ALTARS and self.stage < GenerationStage.ALTARS:
-            self.distribute_altars()
+            with Tracer.span("ALTARS", "generation"):
+                self.distribute_altars()
 
         if target_stage >= GenerationStage.KEYS and self.stage < GenerationStage.KEYS:
-            self.distribute_keys()
+            with Tracer.span("KEYS", "generation"):
+                self.distribute_keys()
 
         if target_stage >= GenerationStage.PREFABS and self.stage < GenerationStage.PREFABS:
-            self.assign_room_prefabs()
+            with Tracer.span("PREFABS", "generation"):
+                self.assign_room_prefabs()
 
         end = perf_counter()
 
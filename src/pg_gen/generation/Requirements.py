@@ -1,5 +1,6 @@
 from copy import copy
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
+from typing import Any
 
 from .RoomParameter import RoomParameterCollection
 
@@ -22,3 +23,18 @@ class Requirements:
         cloned_object = copy(self)
         cloned_object.parameter_chances = RoomParameterCollection().copy_parameters_from(self.parameter_chances)
         return cloned_object
+
+    def get_key(self):
+        # Generation is deterministic, so requirements with the same key always produce the same map
+        return tuple(getattr(self, entry.name) for entry in fields(self) if entry.name != "parameter_chances") + tuple(self.parameter_chances._parameters)
+
+    def serialize(self):
+        data: dict[str, Any] = {entry.name: getattr(self, entry.name) for entry in fields(self) if entry.name != "parameter_chances"}
+        data["parameter_chances"] = copy(self.parameter_chances._parameters)
+        return data
+
+    @staticmethod
+    def deserialize(data: dict[str, Any]):
+        requirements = Requirements(**{key: value for key, value in data.items() if key != "parameter_chances"})
+        requirements.parameter_chances._parameters = copy(data["parameter_chances"])
+        return requirements
@@ -1,5 +1,7 @@
+from copy import copy
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
 
 from ..actors.Player import Player
 from ..support.constants import JUMP_IMPULSE, ROOM_HEIGHT, ROOM_WIDTH
@@ -7,10 +9,11 @@ from ..support.Direction import Direction
 from ..support.Point import Point
 from ..world.Actor import Actor
 from ..world.World import World
-from .RoomInfo import RoomInfo
+from .RoomInfo import NOT_CONNECTED, RoomInfo
 
 if TYPE_CHECKING:
     from ..game_core.Universe import Universe
+    from .Map import Map
 
 
 @dataclass
@@ -51,7 +54,7 @@ class RoomController(Actor):
         self.universe.set_world(self.world)
         return self
 
-    def initialize_room(self, entrance: Direction | None = None):
+    def build_room(self):
         assert self.room is not None
         self.room.difficulty.set_all_parameters(0)
         world = World(self.universe)
@@ -61,6 +64,12 @@ class RoomController(Actor):
         else:
             world.paused = True
 
+        return world
+
+    def initialize_room(self, entrance: Direction | None = None):
+        return self.enter_room(self.build_room(), entrance)
+
+    def enter_room(self, world: World, entrance: Direction | None = None):
         player = self.universe.di.try_inject(Player)
         if player is not None:
             player.transfer_world(world)
@@ -90,4 +99,92 @@ class RoomController(Actor):
 
     @staticmethod
     def initialize_and_activate(universe: "Universe", room: RoomInfo, entrance: Direction | None = None):
-        return RoomController(universe, room=room).initialize_room(entrance).activate()
+        preloader = universe.di.try_inject(RoomPreloader)
+        preloaded = preloader.take(room) if preloader is not None else None
+
+        if preloaded is not None:
+            controller = preloaded.controller.enter_room(preloaded.world, entrance).activate()
+        else:
+            controller = RoomController(universe, room=room).initialize_room(entrance).activate()
+
+        if preloader is not None:
+            preloader.preload_neighbours(room)
+
+        return controller
+
+
+@dataclass
+class _PreloadedRoom:
+    controller: RoomController
+    world: World
+    persistent_flags: list[Any]
+    pickup_type: int
+
+    def is_valid(self):
+        room = self.controller.room
+        assert room is not None
+        return room.persistent_flags == self.persistent_flags and room.pickup_type == self.pickup_type
+
+
+class RoomPreloader:
+    def take(self, room: RoomInfo):
+        if self.universe.map is not self._map:
+            return None
+
+        preloaded = self._rooms.pop(room.position, None)
+        if preloaded is None or preloaded.controller.room is not room or not preloaded.is_valid():
+            return None
+
+        return preloaded
+
+    def preload_neighbours(self, room: RoomInfo):
+        map = self.universe.map
+        if map is not self._map:
+            self._rooms.clear()
+            self._map = map
+
+        self._pending.clear()
+        if map is None:
+            return
+
+        neighbours: list[RoomInfo] = []
+        for direction in Direction.get_directions():
+            position = room.position + Point.from_direction(direction)
+            if room.get_connection(direction) != NOT_CONNECTED and map.has_room(position):
+                neighbours.append(map.get_room(position))
+
+        # Only keep rooms we can reach from the current one, the rest would just take memory
+        self._rooms = {neighbour.position: self._rooms[neighbour.position] for neighbour in neighbours if neighbour.position in self._rooms}
+
+        for neighbour in neighbours:
+            preloaded = self._rooms.get(neighbour.position)
+            if preloaded is None or not preloaded.is_valid():
+                self._pending.append(neighbour)
+
+        if len(self._pending) > 0:
+            self.universe.queue_idle_task(self._preload_pending)
+
+    def _preload_pending(self, deadline: float):
+        while len(self._pending) > 0:
+            # Rooms are built in one go, so only start if the last builds suggest it will fit into the frame
+            if perf_counter() + self._build_time_estimate > deadline:
+                return False
+
+            room = self._pending.pop(0)
+            start = perf_counter()
+            controller = RoomController(self.universe, room=room)
+            world = controller.build_room()
+            self._rooms[room.position] = _PreloadedRoom(controller, world, copy(room.persistent_flags), room.pickup_type)
+            end = perf_counter()
+
+            self._build_time_estimate = max(end - start, self._build_time_estimate * 0.9)
+
+        return True
+
+    def __init__(self, universe: "Universe"):
+        self.universe = universe
+        self._map: "Map | None" = None
+        self._rooms: dict[Point, _PreloadedRoom] = {}
+        self._pending: list[RoomInfo] = []
+        self._build_time_estimate = 0.0
+        pass
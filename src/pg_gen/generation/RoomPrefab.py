@@ -1,17 +1,31 @@
 from copy import copy
 from dataclasses import dataclass, field
 from enum import Enum
+from typing import TYPE_CHECKING
 
-from ..level_editor.LevelSerializer import LevelSerializer
+from ..level_editor.LevelSerializer import CompiledLevel, LevelSerializer
 from ..support.Direction import Direction
 from ..support.ObjectManifest import ObjectManifest
 from ..support.Point import Point
+from ..support.Tracer import Tracer
 from ..world.World import World
 from .RoomController import RoomController
 from .RoomInfo import NOT_CONNECTED, RoomInfo
 from .RoomInstantiationContext import RoomInstantiationContext
 from .RoomTrigger import RoomTrigger
 
+if TYPE_CHECKING:
+    from ..difficulty.ReachabilityAnalyzer import RoomReachability
+    from .RoomPrefabBundle import BundledPrefabData
+
+
+ROOM_TRIGGERS = [
+    (Direction.LEFT, Point(-1.5, 2), Point(1, 2)),
+    (Direction.RIGHT, Point(18.5, 2), Point(1, 2)),
+    (Direction.DOWN, Point(8, 11.5), Point(3, 1)),
+    (Direction.UP, Point(8, -1.5), Point(3, 1)),
+]
+
 
 class RoomPrefabEntrance(Enum):
     CLOSED = 0
@@ -38,13 +52,41 @@ class RoomPrefabEntrance(Enum):
 @dataclass
 class RoomPrefab:
     name: str
-    data: str = field(repr=False)
+    # None for prefabs loaded from a bundle until the level data is first used, read it using get_data
+    data: str | None = field(repr=False)
 
     groups: list[str] = field(default_factory=lambda: [])
 
     _connections: list[RoomPrefabEntrance] = field(default_factory=lambda: [RoomPrefabEntrance(0)] * 4, init=False)
     _is_flipped: bool = False
 
+    reachability: "RoomReachability | None" = field(default=None, init=False, repr=False)
+
+    _compiled: CompiledLevel | None = field(default=None, init=False, repr=False)
+    _compiled_data: str | None = field(default=None, init=False, repr=False)
+    _bundled: "BundledPrefabData | None" = field(default=None, init=False, repr=False)
+
+    def get_data(self):
+        if self.data is None:
+            assert self._bundled is not None, f"Prefab {self.name} has no level data"
+            self.data = self._bundled.get_data()
+        return self.data
+
+    def get_compiled(self):
+        data = self.get_data()
+        if self._compiled is None and self._bundled is not None and data is self._bundled.get_data():
+            self._compiled = self._bundled.get_compiled()
+            self._compiled_data = data
+
+        # The level editor replaces data when saving, so recompile if it changed
+        if self._compiled is None or self._compiled_data is not data:
+            Tracer.count("compiled_prefab_cache_misses")
+            self._compiled = LevelSerializer.compile(data)
+            self._compiled_data = data
+        else:
+            Tracer.count("compiled_prefab_cache_hits")
+        return self._compiled
+
     def get_connection(self, direction: Direction):
         return self._connections[direction]
 
@@ -75,6 +117,7 @@ class RoomPrefab:
         flipped._connections = copy(self._connections)
         flipped._is_flipped = True
         flipped.name = self.name + "`1"
+        flipped.reachability = None
 
         flipped.set_connection(Direction.LEFT, self.get_connection(Direction.RIGHT))
         flipped.set_connection(Direction.RIGHT, self.get_connection(Direction.LEFT))
@@ -96,12 +139,7 @@ class RoomPrefab:
         if controller is None:
             return
 
-        for direction, position, size in [
-            (Direction.LEFT, Point(-1.5, 2), Point(1, 2)),
-            (Direction.RIGHT, Point(18.5, 2), Point(1, 2)),
-            (Direction.DOWN, Point(8, 11.5), Point(3, 1)),
-            (Direction.UP, Point(8, -1.5), Point(3, 1)),
-        ]:
+        for direction, position, size in ROOM_TRIGGERS:
             if room.get_connection(direction) != NOT_CONNECTED:
                 world.add_actor(
                     RoomTrigger(
@@ -145,5 +183,5 @@ class RoomPrefab:
             assert name not in context.only_once_rooms
             context.only_once_rooms.add(name)
 
-        LevelSerializer.deserialize(context.world, self.data, context.handle_actor)
+        LevelSerializer.instantiate(context.world, self.get_compiled(), context.handle_actor)
         context.flip = prev_value
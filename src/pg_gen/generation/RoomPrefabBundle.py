@@ -0,0 +1,174 @@
+import hashlib
+import mmap
+import pickle
+import struct
+from copy import copy
+from dataclasses import dataclass
+from importlib.abc import Traversable
+from pathlib import Path
+
+from ..assets import get_pg_assets
+from ..level_editor.ActorRegistry import ActorRegistry
+from ..level_editor.LevelSerializer import CompiledLevel, LevelSerializer
+from .RoomPrefab import RoomPrefab
+
+BUNDLE_VERSION = 2
+_MAGIC = b"PGROOMS\0"
+_HEADER_LENGTH = struct.Struct("<I")
+
+
+@dataclass
+class LoadedRoomFile:
+    room_path: str
+    modification_time: int | None
+    content_hash: str
+    # The prefab loaded from the file followed by its flipped variant
+    prefabs: list[RoomPrefab]
+
+    @staticmethod
+    def get_content_hash(content: str):
+        return hashlib.sha1(content.encode()).hexdigest()
+
+
+@dataclass
+class _BundleEntry:
+    room_path: str
+    modification_time: int | None
+    content_hash: str
+    # Prefabs without their level data, the data is stored in the payload section
+    prefabs: list[RoomPrefab]
+    data_range: tuple[int, int]
+    compiled_range: tuple[int, int]
+
+
+class BundledPrefabData:
+    # Level data and compiled level of a bundled room file, read from the memory mapped bundle on first use.
+    # Processes mapping the same bundle share its bytes, but each process decodes its own copy of the levels.
+    def get_data(self):
+        if self._data is None:
+            start, end = self._data_range
+            self._data = self._buffer[start:end].decode()
+        return self._data
+
+    def get_compiled(self):
+        if self._compiled is None:
+            start, end = self._compiled_range
+            self._compiled = pickle.loads(memoryview(self._buffer)[start:end])
+            assert isinstance(self._compiled, CompiledLevel)
+        return self._compiled
+
+    def __init__(self, buffer: mmap.mmap, data_range: tuple[int, int], compiled_range: tuple[int, int]):
+        self._buffer = buffer
+        self._data_range = data_range
+        self._compiled_range = compiled_range
+        self._data: str | None = None
+        self._compiled: CompiledLevel | None = None
+        pass
+
+
+class RoomPrefabBundle:
+    @staticmethod
+    def get_bundle_path():
+        return Path(str(get_pg_assets().local)) / "rooms.bundle"
+
+    @staticmethod
+    def get_fingerprint(files: list[tuple[str, Traversable]]):
+        # Based on file metadata only, so checking the bundle does not require reading the room files. The bundle also
+        # stores levels compiled into actor templates, so it is invalidated when the actor sources change.
+        fingerprint = hashlib.sha1()
+        fingerprint.update(f"{ActorRegistry.get_sources_hash()}\n".encode())
+        for room_path, file in files:
+            if not isinstance(file, Path):
+                return None
+            stat = file.stat()
+            fingerprint.update(f"{room_path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+        return fingerprint.hexdigest()
+
+    @staticmethod
+    def write(fingerprint: str, files: list[LoadedRoomFile], bundle_path: Path | None = None):
+        bundle_path = bundle_path or RoomPrefabBundle.get_bundle_path()
+
+        entries: list[_BundleEntry] = []
+        payloads: list[bytes] = []
+        offset = 0
+
+        def add_payload(payload: bytes):
+            nonlocal offset
+            payloads.append(payload)
+            offset += len(payload)
+            return (offset - len(payload), offset)
+
+        for file in files:
+            data = file.prefabs[0].get_data()
+            templates: list[RoomPrefab] = []
+            for prefab in file.prefabs:
+                template = copy(prefab)
+                template.data = None
+                template.reachability = None
+                template._compiled = None
+                template._compiled_data = None
+                template._bundled = None
+                templates.append(template)
+
+            data_range = add_payload(data.encode())
+            compiled_range = add_payload(pickle.dumps(LevelSerializer.compile(data), protocol=pickle.HIGHEST_PROTOCOL))
+
+            entries.append(_BundleEntry(file.room_path, file.modification_time, file.content_hash, templates, data_range, compiled_range))
+
+        header = pickle.dumps({"version": BUNDLE_VERSION, "fingerprint": fingerprint, "entries": entries}, protocol=pickle.HIGHEST_PROTOCOL)
+
+        bundle_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = bundle_path.with_suffix(".tmp")
+        with open(temp_path, "wb") as file:
+            file.write(_MAGIC)
+            file.write(_HEADER_LENGTH.pack(len(header)))
+            file.write(header)
+            for payload in payloads:
+                file.write(payload)
+        temp_path.replace(bundle_path)
+
+        return bundle_path
+
+    @staticmethod
+    def read(fingerprint: str, bundle_path: Path | None = None):
+        bundle_path = bundle_path or RoomPrefabBundle.get_bundle_path()
+
+        try:
+            with open(bundle_path, "rb") as file:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        if buffer[: len(_MAGIC)] != _MAGIC:
+            print(f"Ignoring invalid room bundle {bundle_path}")
+            return None
+
+        header_start = len(_MAGIC) + _HEADER_LENGTH.size
+        (header_length,) = _HEADER_LENGTH.unpack_from(buffer, len(_MAGIC))
+        payload_start = header_start + header_length
+
+        try:
+            header = pickle.loads(memoryview(buffer)[header_start:payload_start])
+        except Exception:
+            print(f"Ignoring invalid room bundle {bundle_path}")
+            return None
+
+        if header.get("version") != BUNDLE_VERSION or header.get("fingerprint") != fingerprint:
+            print(f"Room bundle {bundle_path} is out of date, loading rooms from files")
+            return None
+
+        files: list[LoadedRoomFile] = []
+        for entry in header["entries"]:
+            assert isinstance(entry, _BundleEntry)
+            data_start, data_end = entry.data_range
+            compiled_start, compiled_end = entry.compiled_range
+            bundled = BundledPrefabData(buffer, (payload_start + data_start, payload_start + data_end), (payload_start + compiled_start, payload_start + compiled_end))
+
+            # The flipped variant shares the bundled data, same as it shares the data string after a regular load
+            for prefab in entry.prefabs:
+                prefab.data = None
+                prefab._bundled = bundled
+
+            files.append(LoadedRoomFile(entry.room_path, entry.modification_time, entry.content_hash, entry.prefabs))
+
+        return files
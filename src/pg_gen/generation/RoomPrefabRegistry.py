@@ -1,5 +1,8 @@
+import hashlib
 import json
 from importlib.abc import Traversable
+from pathlib import Path
+from time import perf_counter
 
 from ..assets import get_pg_assets, walk_files_recursive
 from ..support.Direction import Direction
@@ -7,6 +10,7 @@ from ..support.ObjectManifest import ObjectManifestDeserializer
 from .RoomInfo import NO_KEY, NO_PICKUP, NOT_CONNECTED, PORTAL, RoomInfo
 from .RoomInstantiationContext import RoomInstantiationContext
 from .RoomPrefab import RoomPrefab, RoomPrefabEntrance
+from .RoomPrefabBundle import LoadedRoomFile, RoomPrefabBundle
 
 
 class RoomPrefabRegistry:
@@ -58,44 +62,203 @@ class RoomPrefabRegistry:
 
             if rejected:
                 continue
+
+            if room.reachability is not None:
+                connected = frozenset(direction for direction in Direction.get_directions() if requirements.get_connection(direction) != NOT_CONNECTED)
+                if not room.reachability.is_traversable(connected):
+                    if debug_info is not None:
+                        debug_info.append(f"    Rejected: not traversable between {", ".join(direction.name for direction in connected)}")
+                    continue
+
             result.append(room)
 
         return result
 
     @classmethod
-    def load(cls):
+    def get_prefabs(cls):
+        # Rooms in different directories can share a name, so collect them from the groups as well
+        prefabs: dict[int, RoomPrefab] = {id(room): room for room in cls.rooms_by_name.values()}
+        for rooms in cls.rooms_by_group.values():
+            for room in rooms:
+                prefabs.setdefault(id(room), room)
+        return list(prefabs.values())
+
+    @classmethod
+    def _load_file(cls, file: Traversable, file_content: str):
+        name = file.name[0:-5]
+
+        raw_data: dict = json.loads(file_content)
+        room = RoomPrefab(name, file_content)
+        config = raw_data["$config"]
+
+        ObjectManifestDeserializer.deserialize(config, room, RoomPrefab.get_manifest())
+
+        prefabs = [room]
+        if room.allow_flip:
+            prefabs.append(room.flip())
+
+        return prefabs
+
+    @classmethod
+    def _add_prefabs(cls, prefabs: list[RoomPrefab]):
+        for prefab in prefabs:
+            cls.rooms_by_name[prefab.name] = prefab
+            for group in prefab.groups:
+                cls.rooms_by_group.setdefault(group, []).append(prefab)
+
+    @classmethod
+    def _replace_prefabs(cls, old_prefabs: list[RoomPrefab], new_prefabs: list[RoomPrefab]):
+        # Prefabs keep their position in each group they stay in, so room selection order does not change after a reload
+        for i, old in enumerate(old_prefabs):
+            new = new_prefabs[i] if i < len(new_prefabs) else None
+
+            # Names are not unique across directories, only take over the entry if this prefab owned it
+            if cls.rooms_by_name.get(old.name) is old:
+                del cls.rooms_by_name[old.name]
+                if new is not None:
+                    cls.rooms_by_name[new.name] = new
+
+            for group in old.groups:
+                rooms = cls.rooms_by_group.get(group)
+                if rooms is None:
+                    continue
+
+                index = next((j for j, room in enumerate(rooms) if room is old), None)
+                if index is None:
+                    continue
+
+                if new is not None and group in new.groups:
+                    rooms[index] = new
+                else:
+                    rooms.pop(index)
+                    if len(rooms) == 0:
+                        del cls.rooms_by_group[group]
+
+        for i, new in enumerate(new_prefabs):
+            old = old_prefabs[i] if i < len(old_prefabs) else None
+            cls.rooms_by_name.setdefault(new.name, new)
+            for group in new.groups:
+                if old is None or group not in old.groups:
+                    cls.rooms_by_group.setdefault(group, []).append(new)
+
+    @staticmethod
+    def _get_modification_time(file: Traversable):
+        # Resources inside archives cannot be stat-ed, those are always compared by content
+        if isinstance(file, Path):
+            return file.stat().st_mtime_ns
+        return None
+
+    @staticmethod
+    def _get_room_files():
+        files: list[tuple[str, Traversable]] = []
+
+        def add_file(file: Traversable, room_path: str):
+            if file.name.endswith(".json"):
+                files.append((room_path, file))
+
+        walk_files_recursive(get_pg_assets().rooms, add_file)
+        return files
+
+    @classmethod
+    def _add_loaded_file(cls, loaded: LoadedRoomFile):
+        cls._add_prefabs(loaded.prefabs)
+        cls._loaded_files[loaded.room_path] = loaded
+
+    @classmethod
+    def load(cls, use_bundle=True):
         cls.rooms_by_group.clear()
         cls.rooms_by_name.clear()
+        cls._loaded_files.clear()
 
-        def load_room(file: Traversable, room_path: str):
-            if not file.name.endswith(".json"):
+        files = cls._get_room_files()
+
+        if use_bundle:
+            start = perf_counter()
+            fingerprint = RoomPrefabBundle.get_fingerprint(files)
+            bundled = RoomPrefabBundle.read(fingerprint) if fingerprint is not None else None
+            if bundled is not None:
+                for loaded in bundled:
+                    cls._add_loaded_file(loaded)
+                print(f"Loaded {len(bundled)} room files from bundle in {(perf_counter() - start) * 1000:.1f} ms")
                 return
 
-            name = file.name[0:-5]
+        for room_path, file in files:
             print(f"Loading room {room_path}...")
 
+            modification_time = cls._get_modification_time(file)
+            file_content = file.read_text()
+            prefabs = cls._load_file(file, file_content)
+            cls._add_loaded_file(LoadedRoomFile(room_path, modification_time, LoadedRoomFile.get_content_hash(file_content), prefabs))
+
+            for prefab in prefabs:
+                print(f"Loaded room {prefab}")
+
+    @classmethod
+    def get_content_hash(cls):
+        # Identifies the contents of all loaded rooms, results computed from generated maps are only valid for the same rooms
+        content_hash = hashlib.sha1()
+        for room_path, loaded in sorted(cls._loaded_files.items()):
+            content_hash.update(f"{room_path}\0{loaded.content_hash}\n".encode())
+        return content_hash.hexdigest()
+
+    @classmethod
+    def build_bundle(cls):
+        cls.load(use_bundle=False)
+        # Files without a fingerprint (e.g. inside an archive) can never be validated, so there is no point in bundling them
+        fingerprint = RoomPrefabBundle.get_fingerprint(cls._get_room_files())
+        if fingerprint is None:
+            return None
+        return RoomPrefabBundle.write(fingerprint, list(cls._loaded_files.values()))
+
+    @classmethod
+    def reload(cls):
+        if len(cls._loaded_files) == 0:
+            cls.load()
+            return
+
+        start = perf_counter()
+        found: set[str] = set()
+        changed = 0
+
+        def reload_room(file: Traversable, room_path: str):
+            nonlocal changed
+            if not file.name.endswith(".json"):
+                return
+
+            found.add(room_path)
+            loaded = cls._loaded_files.get(room_path)
+
+            modification_time = cls._get_modification_time(file)
+            if loaded is not None and modification_time is not None and loaded.modification_time == modification_time:
+                return
+
             file_content = file.read_text()
+            content_hash = LoadedRoomFile.get_content_hash(file_content)
+            if loaded is not None and loaded.content_hash == content_hash:
+                loaded.modification_time = modification_time
+                return
 
-            raw_data: dict = json.loads(file_content)
-            room = RoomPrefab(name, file_content)
-            cls.rooms_by_name[name] = room
-            config = raw_data["$config"]
+            prefabs = cls._load_file(file, file_content)
+            if loaded is None:
+                cls._add_prefabs(prefabs)
+            else:
+                cls._replace_prefabs(loaded.prefabs, prefabs)
 
-            ObjectManifestDeserializer.deserialize(config, room, RoomPrefab.get_manifest())
+            cls._loaded_files[room_path] = LoadedRoomFile(room_path, modification_time, content_hash, prefabs)
+            changed += 1
 
-            for group in room.groups:
-                cls.rooms_by_group.setdefault(group, []).append(room)
+            for prefab in prefabs:
+                print(f"Reloaded room {prefab}")
 
-            print(f"Loaded room {room}")
+        walk_files_recursive(get_pg_assets().rooms, reload_room)
 
-            if room.allow_flip:
-                flipped = room.flip()
-                cls.rooms_by_name[flipped.name] = flipped
-                for group in flipped.groups:
-                    cls.rooms_by_group.setdefault(group, []).append(flipped)
-                print(f"Loaded room {flipped}")
+        for room_path in [room_path for room_path in cls._loaded_files if room_path not in found]:
+            cls._replace_prefabs(cls._loaded_files.pop(room_path).prefabs, [])
+            changed += 1
+            print(f"Removed room {room_path}")
 
-        walk_files_recursive(get_pg_assets().rooms, load_room)
+        print(f"Reloaded {changed} room files in {(perf_counter() - start) * 1000:.1f} ms")
 
     rooms_by_name: dict[str, RoomPrefab] = {}
     rooms_by_group: dict[str, list[RoomPrefab]] = {}
+    _loaded_files: dict[str, LoadedRoomFile] = {}
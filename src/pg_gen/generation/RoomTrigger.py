@@ -2,7 +2,7 @@ from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, override
 
 from ..actors.Player import Player
-from ..game_core.Camera import CameraClient
+from ..game_core.CameraClient import CameraClient
 from ..support.Color import Color
 from ..support.Direction import Direction
 from ..world.Actor import Actor
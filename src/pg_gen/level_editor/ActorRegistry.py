@@ -1,7 +1,11 @@
+import hashlib
+import json
+import sys
 from copy import copy
 from dataclasses import dataclass
 from importlib import import_module
 from importlib.abc import Traversable
+from pathlib import Path
 from typing import Type
 
 from ..assets import get_pg_assets, walk_files_recursive
@@ -26,18 +30,42 @@ class ActorType:
 class ActorRegistry:
 
     _types: dict[str, ActorType] = {}
-    _types_array: list[tuple[str, ActorType]] = []
+    _types_array: list[tuple[str, ActorType]] | None = None
+    # Maps actor names to the module that registers them, loaded from the generated manifest
+    _modules: dict[str, str] | None = None
+    _registered_by: dict[str, str] = {}
+    _all_loaded = False
+    _sources_hash: str | None = None
 
     @staticmethod
     def find_actor_type(name: str):
-        return ActorRegistry._types[name]
+        actor_type = ActorRegistry.try_find_actor_type(name)
+        if actor_type is None:
+            raise KeyError(name)
+        return actor_type
 
     @staticmethod
     def try_find_actor_type(name: str):
+        actor_type = ActorRegistry._types.get(name, None)
+        if actor_type is not None or ActorRegistry._all_loaded:
+            return actor_type
+
+        modules = ActorRegistry._modules
+        if modules is None:
+            ActorRegistry.load_all_actors()
+        elif name in modules:
+            ActorRegistry._import_actor_module(modules[name])
+            if name not in ActorRegistry._types:
+                print("Actor manifest does not match the registered actors, run build-actor-manifest")
+                ActorRegistry.load_all_actors()
+
         return ActorRegistry._types.get(name, None)
 
     @staticmethod
     def get_actor_types():
+        ActorRegistry.load_all_actors()
+        if ActorRegistry._types_array is None:
+            ActorRegistry._types_array = sorted([(name, value) for name, value in ActorRegistry._types.items()], key=lambda x: x[0])
         return ActorRegistry._types_array
 
     @staticmethod
@@ -50,17 +78,79 @@ class ActorRegistry:
             name = name_override
 
         ActorRegistry._types[name] = ActorType(name, type, default_value)
+        ActorRegistry._types_array = None
+        # The module calling this is the one to import for the name, nested imports register their own actors
+        ActorRegistry._registered_by[name] = sys._getframe(1).f_globals["__name__"]
+
+    @staticmethod
+    def _import_actor_module(module_name: str):
+        import_module(module_name, __package__)
+
+    @staticmethod
+    def _get_actor_modules():
+        modules: list[tuple[str, Traversable]] = []
+
+        def add_module(file: Traversable, path: str):
+            if path.endswith(".py"):
+                modules.append(("pg_gen.actors" + path[:-3], file))
+
+        walk_files_recursive(get_pg_assets().actors, add_module)
+        # Directory order depends on the filesystem, sorted so the manifest is the same everywhere
+        return sorted(modules, key=lambda x: x[0])
+
+    @staticmethod
+    def _get_sources_hash(modules: list[tuple[str, Traversable]]):
+        sources_hash = hashlib.sha1()
+        for module_name, file in sorted(modules, key=lambda x: x[0]):
+            sources_hash.update(module_name.encode() + b"\0")
+            sources_hash.update(file.read_bytes())
+        return sources_hash.hexdigest()
+
+    @staticmethod
+    def get_sources_hash():
+        # Read once per process, both the manifest and the room bundle are validated against it
+        if ActorRegistry._sources_hash is None:
+            ActorRegistry._sources_hash = ActorRegistry._get_sources_hash(ActorRegistry._get_actor_modules())
+        return ActorRegistry._sources_hash
+
+    @staticmethod
+    def load_all_actors():
+        if ActorRegistry._all_loaded:
+            return
+
+        for module_name, _ in ActorRegistry._get_actor_modules():
+            ActorRegistry._import_actor_module(module_name)
+
+        ActorRegistry._all_loaded = True
 
     @staticmethod
     def load_actors():
-        assets = get_pg_assets()
+        # Actor modules are imported on first use if the manifest matches the actor sources, otherwise everything is imported now
+        if ActorRegistry._all_loaded or ActorRegistry._modules is not None:
+            return
 
-        def load_actor(file: Traversable, path: str):
-            if not path.endswith(".py"):
-                return
-            module_name = "pg_gen.actors" + path[:-3]
-            import_module(module_name, __package__)
+        try:
+            manifest = json.loads(get_pg_assets().actor_manifest.read_text())
+        except FileNotFoundError:
+            manifest = None
 
-        walk_files_recursive(assets.actors, load_actor)
+        if manifest is not None and manifest.get("sources") == ActorRegistry.get_sources_hash():
+            ActorRegistry._modules = manifest["actors"]
+            return
 
-        ActorRegistry._types_array = sorted([(name, value) for name, value in ActorRegistry._types.items()], key=lambda x: x[0])
+        print("Actor manifest is missing or out of date, importing all actors")
+        ActorRegistry.load_all_actors()
+
+    @staticmethod
+    def build_manifest():
+        ActorRegistry.load_all_actors()
+        modules = ActorRegistry._get_actor_modules()
+
+        manifest = {
+            "sources": ActorRegistry._get_sources_hash(modules),
+            "actors": dict(sorted(ActorRegistry._registered_by.items())),
+        }
+
+        manifest_path = Path(str(get_pg_assets().actor_manifest))
+        manifest_path.write_text(json.dumps(manifest, indent=4) + "\n")
+        return manifest_path
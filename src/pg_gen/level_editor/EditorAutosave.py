@@ -0,0 +1,98 @@
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from time import perf_counter
+from traceback import print_exc
+from typing import Any, Callable
+
+from .LevelSerializer import LevelSerializer
+
+_DEBOUNCE_TIME = 0.5
+
+
+def _write_file(file_path: str, data: dict[str, Any]):
+    start = perf_counter()
+    content = LevelSerializer.dumps(data)
+
+    # Write next to the target and rename, so a crash mid-write never leaves a truncated level file
+    temp_path = file_path + ".tmp"
+    with open(temp_path, "wt") as file:
+        file.write(content)
+    os.replace(temp_path, file_path)
+
+    return perf_counter() - start
+
+
+class EditorAutosave:
+    def request_save(self, file_path: str, get_data: Callable[[], dict[str, Any]]):
+        # Repeated requests are coalesced, only the latest state is written once edits settle
+        self._pending = (file_path, get_data)
+        self._requested_at = perf_counter()
+
+    def _collect(self):
+        future = self._future
+        if future is None or not future.done():
+            return
+
+        self._future = None
+        try:
+            self.last_latency = future.result()
+            self.last_error = None
+        except Exception as error:
+            print_exc()
+            self.last_error = error
+
+    def _submit(self):
+        assert self._pending is not None
+        file_path, get_data = self._pending
+        self._pending = None
+
+        # The data is snapshotted on the main thread, the worker only encodes and writes it
+        start = perf_counter()
+        data = get_data()
+        self.last_snapshot_time = perf_counter() - start
+
+        self._future = self._executor.submit(_write_file, file_path, data)
+
+    def update(self):
+        self._collect()
+
+        if self._pending is not None and self._future is None and perf_counter() - self._requested_at >= _DEBOUNCE_TIME:
+            self._submit()
+
+    def flush(self, wait=True):
+        if self._pending is not None:
+            if self._future is not None:
+                # Writes must not be reordered, wait for the previous one to finish
+                self._future.exception()
+                self._collect()
+            self._submit()
+
+        if wait and self._future is not None:
+            self._future.exception()
+            self._collect()
+
+    def is_saving(self):
+        return self._pending is not None or self._future is not None
+
+    def get_status(self):
+        if self.last_error is not None:
+            return f"Save failed: {self.last_error}"
+        if self.is_saving():
+            return "Saving..."
+        if self.last_latency is not None:
+            return f"Saved ({self.last_snapshot_time * 1000:.1f} ms + {self.last_latency * 1000:.1f} ms)"
+        return None
+
+    def shutdown(self):
+        self.flush()
+        self._executor.shutdown()
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="autosave")
+        self._pending: tuple[str, Callable[[], dict[str, Any]]] | None = None
+        self._requested_at = 0.0
+        self._future: Future[float] | None = None
+        self.last_latency: float | None = None
+        self.last_snapshot_time = 0.0
+        self.last_error: Exception | None = None
+        pass
@@ -0,0 +1,232 @@
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from ..actors.support.ConfigurableObject import ConfigurableObject
+from ..support.Point import Point
+from ..world.Actor import Actor
+from .ActorRegistry import ActorType
+
+if TYPE_CHECKING:
+    from .LevelEditor import LevelEditor
+
+_HISTORY_LIMIT = 256
+_CHECKPOINT_INTERVAL = 32
+
+type _ActorRecord = tuple[Point, Point, str | None]
+type _Selection = tuple[Actor | None, list[Actor] | None]
+
+
+def _get_record(actor: Actor) -> _ActorRecord:
+    return actor.position, actor.size, actor.config if isinstance(actor, ConfigurableObject) else None
+
+
+@dataclass
+class _EditorState:
+    actors: list[Actor]
+    types: list[ActorType]
+    records: dict[int, _ActorRecord]
+    selection: _Selection
+    checkpoint: str | None
+
+
+@dataclass
+class _HistoryEntry:
+    # Actors that exist only before or only after the change, with their index in the managed actor list
+    removed: list[tuple[int, Actor, ActorType]] = field(default_factory=lambda: [])
+    added: list[tuple[int, Actor, ActorType]] = field(default_factory=lambda: [])
+    changed: list[tuple[Actor, _ActorRecord, _ActorRecord]] = field(default_factory=lambda: [])
+    # Full actor order before and after, only stored if the order of the remaining actors changed
+    order: tuple[list[tuple[Actor, ActorType]], list[tuple[Actor, ActorType]]] | None = None
+    selection: tuple[_Selection, _Selection] = ((None, None), (None, None))
+    # Serialized state before the change, used to recover if the delta cannot be applied
+    checkpoint: str | None = None
+
+
+def _is_same_selection(a: _Selection, b: _Selection):
+    if a[0] is not b[0]:
+        return False
+    if a[1] is None or b[1] is None:
+        return a[1] is b[1]
+    return len(a[1]) == len(b[1]) and all(x is y for x, y in zip(a[1], b[1]))
+
+
+class EditorHistory:
+    def _capture(self, with_checkpoint=False):
+        editor = self.editor
+        multiselect = editor._multiselect_actors
+
+        return _EditorState(
+            actors=list(editor._managed_actors),
+            types=list(editor._managed_actors_types),
+            records={id(actor): _get_record(actor) for actor in editor._managed_actors},
+            selection=(editor.selected_actor, list(multiselect) if multiselect is not None else None),
+            checkpoint=editor.get_save_data({"selected_index": self._get_selected_index()}) if with_checkpoint else None,
+        )
+
+    def _capture_baseline(self):
+        self._capture_count += 1
+        self._baseline = self._capture(with_checkpoint=self._capture_count % _CHECKPOINT_INTERVAL == 0)
+
+    def _get_selected_index(self):
+        editor = self.editor
+        if editor._multiselect_actors:
+            return [editor._managed_actors.index(v) for v in editor._multiselect_actors]
+        elif editor.selected_actor is not None:
+            return editor._managed_actors.index(editor.selected_actor)
+        return None
+
+    def _create_entry(self, before: _EditorState, after: _EditorState):
+        entry = _HistoryEntry(checkpoint=before.checkpoint)
+
+        for index, actor in enumerate(before.actors):
+            record = after.records.get(id(actor))
+            if record is None:
+                entry.removed.append((index, actor, before.types[index]))
+            elif record != before.records[id(actor)]:
+                entry.changed.append((actor, before.records[id(actor)], record))
+
+        for index, actor in enumerate(after.actors):
+            if id(actor) not in before.records:
+                entry.added.append((index, actor, after.types[index]))
+
+        remaining_before = [id(actor) for actor in before.actors if id(actor) in after.records]
+        remaining_after = [id(actor) for actor in after.actors if id(actor) in before.records]
+        if remaining_before != remaining_after:
+            entry.order = (list(zip(before.actors, before.types)), list(zip(after.actors, after.types)))
+
+        entry.selection = (before.selection, after.selection)
+
+        if len(entry.removed) == 0 and len(entry.added) == 0 and len(entry.changed) == 0 and entry.order is None and _is_same_selection(*entry.selection):
+            return None
+
+        return entry
+
+    def _commit_pending(self):
+        # Changes made since the last history operation become a new entry
+        entry = self._create_entry(self._baseline, self._capture())
+        if entry is not None:
+            self._undo_history.append(entry)
+        return entry
+
+    def _apply_entry(self, entry: _HistoryEntry, undo: bool):
+        editor = self.editor
+        world = editor.world
+        managed = editor._managed_actors
+        managed_ids = set(id(actor) for actor in managed)
+
+        to_remove, to_insert = (entry.added, entry.removed) if undo else (entry.removed, entry.added)
+
+        # Make sure the delta matches the current state, otherwise it was changed outside of the history
+        if (
+            any(id(actor) not in managed_ids for _, actor, _ in to_remove)
+            or any(id(actor) in managed_ids for _, actor, _ in to_insert)
+            or any(id(actor) not in managed_ids for actor, _, _ in entry.changed)
+        ):
+            return False
+
+        for _, actor, _ in to_remove:
+            index = next(i for i, v in enumerate(managed) if v is actor)
+            managed.pop(index)
+            editor._managed_actors_types.pop(index)
+            actor.remove()
+
+        if entry.order is not None:
+            order = entry.order[0] if undo else entry.order[1]
+            for actor in managed:
+                actor.remove()
+            managed.clear()
+            editor._managed_actors_types.clear()
+
+            for actor, type in order:
+                world.add_actor(actor)
+                editor.add_managed_actor(actor, type)
+        elif len(to_insert) > 0:
+            to_insert = sorted(to_insert, key=lambda x: x[0])
+            for index, actor, type in to_insert:
+                managed.insert(index, actor)
+                editor._managed_actors_types.insert(index, type)
+
+            # Draw order follows the managed actor order, so re-add everything after the first inserted actor
+            for actor in managed[to_insert[0][0] :]:
+                actor.remove()
+                world.add_actor(actor)
+
+        for actor, before, after in entry.changed:
+            position, size, config = before if undo else after
+            actor.position = position
+            actor.size = size
+            if config is not None and isinstance(actor, ConfigurableObject):
+                actor.apply_config(config)
+
+        selected, multiselect = entry.selection[0] if undo else entry.selection[1]
+        editor.selected_actor = selected
+        editor._multiselect_actors = list(multiselect) if multiselect is not None else None
+
+        return True
+
+    def _restore_checkpoint(self, entry: _HistoryEntry):
+        # Actor identities change when loading from a checkpoint, so the rest of the history cannot be used anymore
+        checkpoint = entry.checkpoint
+        while checkpoint is None and len(self._undo_history) > 0:
+            checkpoint = self._undo_history.pop().checkpoint
+
+        self._undo_history.clear()
+        self._redo_history.clear()
+
+        if checkpoint is not None:
+            print("Failed to apply history entry, restoring from checkpoint")
+            editor = self.editor
+            data = editor.apply_save_data(checkpoint)
+            selected_index = data["selected_index"]
+            if isinstance(selected_index, int):
+                editor.selected_actor = editor._managed_actors[selected_index]
+            elif isinstance(selected_index, list):
+                editor.selected_actor = editor._managed_actors[selected_index[-1]]
+                editor._multiselect_actors = [editor._managed_actors[i] for i in selected_index]
+        else:
+            print("Failed to apply history entry, history cleared")
+
+    def push(self):
+        self._commit_pending()
+        self._redo_history.clear()
+        self._capture_baseline()
+
+    def undo(self):
+        if self._commit_pending() is not None:
+            self._redo_history.clear()
+
+        if len(self._undo_history) > 0:
+            entry = self._undo_history.pop()
+            if self._apply_entry(entry, undo=True):
+                self._redo_history.append(entry)
+            else:
+                self._restore_checkpoint(entry)
+
+        self._capture_baseline()
+
+    def redo(self):
+        if self._commit_pending() is not None:
+            self._redo_history.clear()
+
+        if len(self._redo_history) > 0:
+            entry = self._redo_history.pop()
+            if self._apply_entry(entry, undo=False):
+                self._undo_history.append(entry)
+            else:
+                self._restore_checkpoint(entry)
+
+        self._capture_baseline()
+
+    def reset(self):
+        self._undo_history.clear()
+        self._redo_history.clear()
+        self._capture_baseline()
+
+    def __init__(self, editor: "LevelEditor"):
+        self.editor = editor
+        self._undo_history: deque[_HistoryEntry] = deque(maxlen=_HISTORY_LIMIT)
+        self._redo_history: deque[_HistoryEntry] = deque(maxlen=_HISTORY_LIMIT)
+        self._capture_count = 0
+        self._baseline = self._capture()
+        pass
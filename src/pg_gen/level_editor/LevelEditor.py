@@ -11,7 +11,7 @@ import pygame
 
 from ..actors.support.ConfigurableObject import ConfigurableObject
 from ..actors.support.GuiRenderer import GuiRenderer
-from ..game_core.Camera import CameraClient
+from ..game_core.CameraClient import CameraClient
 from ..game_core.InputClient import InputClient
 from ..game_core.ResourceClient import ResourceClient
 from ..generation.RoomInfo import RoomInfo
@@ -28,6 +28,8 @@ from ..support.Point import Axis, Point
 from ..support.resolve_intersection import is_intersection
 from ..world.Actor import Actor
 from .ActorRegistry import ActorRegistry, ActorType
+from .EditorAutosave import EditorAutosave
+from .EditorHistory import EditorHistory
 from .LevelSerializer import LevelSerializer
 from .TestPlayController import TestPlayController
 
@@ -49,8 +51,6 @@ class LevelEditor(GuiRenderer, ResourceClient, InputClient, CameraClient):
 
     _managed_actors: list[Actor] = field(init=False, default_factory=lambda: [])
     _managed_actors_types: list[ActorType] = field(init=False, default_factory=lambda: [])
-    _undo_history: list[str] = field(init=False, repr=False, default_factory=lambda: [])
-    _redo_history: list[str] = field(init=False, repr=False, default_factory=lambda: [])
 
     _selected_actor_type: ActorType | None = None
     _design_mode: bool = True
@@ -120,6 +120,14 @@ class LevelEditor(GuiRenderer, ResourceClient, InputClient, CameraClient):
 
             self._config_init = True
 
+    @cached_property
+    def _history(self):
+        return EditorHistory(self)
+
+    @cached_property
+    def _autosave(self):
+        return EditorAutosave()
+
     @cached_property
     def _gui(self):
         def update(value: bool):
@@ -231,6 +239,12 @@ class LevelEditor(GuiRenderer, ResourceClient, InputClient, CameraClient):
             if (actor != self.selected_actor or self._multiselect_actors is not None) and isinstance(actor, ConfigurableObject):
                 self._resource_provider.font.render_to(self._camera.screen, self._camera.world_to_screen(actor.position).to_pygame_coordinates(), actor.config, TEXT_COLOR, TEXT_BG_COLOR)
 
+        save_status = self._autosave.get_status()
+        if save_status is not None:
+            # Size 0 is the default size of the font
+            status_position = Point(0, surface.get_height() - self._resource_provider.font.get_sized_height(0))
+            self._resource_provider.font.render_to(self._camera.screen, status_position.to_pygame_coordinates(), save_status, TEXT_COLOR, TEXT_BG_COLOR)
+
         if self._object_config_gui is not None:
             self._object_config_gui.update_and_render(self._camera, self._input)
         else:
@@ -345,17 +359,22 @@ class LevelEditor(GuiRenderer, ResourceClient, InputClient, CameraClient):
         return aux_data
 
     def push_undo_stack(self):
-        self._create_history_entry(self._undo_history)
-        self._redo_history.clear()
+        self._history.push()
 
     def handle_file_changed(self):
         if self.file_path is not None:
             if self._prefab is None:
                 self._prefab = RoomPrefab(name="", data="")
             self._aux_data = {"$config": ObjectManifestSerializer.serialize(self._prefab, RoomPrefab.get_manifest())}
-            save_data = self.get_save_data(self._aux_data)
-            with open(self.file_path, "wt") as file:
-                file.write(save_data)
+            aux_data = self._aux_data
+            self._autosave.request_save(self.file_path, lambda: LevelSerializer.serialize_data(self._managed_actors, self._managed_actors_types, aux_data))
+
+    def flush_autosave(self, wait=True):
+        self._autosave.flush(wait)
+
+    def close(self):
+        # Writes the pending changes and stops the autosave worker, the editor cannot save after this
+        self._autosave.shutdown()
 
     def open_file(self, file_path: str):
         self.file_path = file_path
@@ -370,43 +389,13 @@ class LevelEditor(GuiRenderer, ResourceClient, InputClient, CameraClient):
             # If the level file is not found we are creating a new level, we can keep the current, empty, state
             pass
 
-    def _create_history_entry(self, target: list[str]):
-        if self._multiselect_actors:
-            selected_index = [self._managed_actors.index(v) for v in self._multiselect_actors]
-        elif self.selected_actor is not None:
-            selected_index = self._managed_actors.index(self.selected_actor)
-        else:
-            selected_index = None
-
-        state = self.get_save_data({"selected_index": selected_index})
-        target.append(state)
-
-    def _apply_history_entry(self, target: list[str]):
-        if len(target) == 0:
-            return False
-
-        state = target.pop()
-        data = self.apply_save_data(state)
-        selected_index = data["selected_index"]
-        if isinstance(selected_index, int):
-            self.selected_actor = self._managed_actors[selected_index]
-        elif isinstance(selected_index, list):
-            self._multiselect_actors = [self._managed_actors[i] for i in selected_index]
-            self.selected_actor = self._managed_actors[selected_index[-1]]
-
-        return True
+        self._history.reset()
 
     def undo(self):
-        self._create_history_entry(self._redo_history)
-        if not self._apply_history_entry(self._undo_history):
-            # Undo operation failed, revert change to redo history
-            self._redo_history.pop()
+        self._history.undo()
 
     def redo(self):
-        self._create_history_entry(self._undo_history)
-        if not self._apply_history_entry(self._redo_history):
-            # Redo operation failed, revert change to undo history
-            self._undo_history.pop()
+        self._history.redo()
 
     def duplicate(self):
         actor = self.selected_actor
@@ -426,6 +415,8 @@ class LevelEditor(GuiRenderer, ResourceClient, InputClient, CameraClient):
 
     def test_play(self):
         self.handle_file_changed()
+        # Test play may load prefabs from disk, so the file must be up to date
+        self.flush_autosave()
 
         spawn_position = Point(*pygame.mouse.get_pos()) * (1 / self._camera.zoom) - Point(0.5, 0.5)
         if self._prefab is None:
@@ -565,6 +556,9 @@ class LevelEditor(GuiRenderer, ResourceClient, InputClient, CameraClient):
                     self.handle_file_changed()
             elif event.type == pygame.WINDOWLEAVE:
                 self.handle_file_changed()
+                self.flush_autosave(wait=False)
+
+        self._autosave.update()
 
         if self.selected_actor is not None and self.selected_actor.world is None:  # type: ignore
             self.selected_actor = None
@@ -1,5 +1,6 @@
 import json
 from copy import copy
+from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any, Callable, Literal
 
 from ..actors.support.ConfigurableObject import ConfigurableObject
@@ -10,12 +11,17 @@ from .ActorRegistry import ActorRegistry, ActorType
 if TYPE_CHECKING:
     from ..world.World import World
 
-_JSON_CACHE: dict[str, Any] = {}
+
+@dataclass(frozen=True)
+class CompiledLevel:
+    # Fully configured actor instances, actors are created by copying them
+    actors: tuple[tuple[Actor, ActorType], ...]
+    aux_data: dict[str, Any]
 
 
 class LevelSerializer:
     @staticmethod
-    def serialize(actors: list[Actor], types: list[ActorType], aux_data: dict):
+    def serialize_data(actors: list[Actor], types: list[ActorType], aux_data: dict) -> dict[str, Any]:
         actors_data = [
             {
                 "pos": actor.position.serialize(),
@@ -25,25 +31,25 @@ class LevelSerializer:
             for i, actor in enumerate(actors)
         ]
 
-        data = {"actors": actors_data, **aux_data}
+        return {"actors": actors_data, **aux_data}
 
+    @staticmethod
+    def dumps(data: dict[str, Any]):
         return json.dumps(data, indent=4, sort_keys=True) + "\n"
 
     @staticmethod
-    def deserialize(world: "World", raw_data: str, spawn_callback: Callable[[Actor, ActorType], Literal[False] | None] | None = None):
-        data = _JSON_CACHE.get(raw_data)
-        if data is None:
-            data = json.loads(raw_data)
-            _JSON_CACHE[raw_data] = data
-        data = copy(data)
+    def serialize(actors: list[Actor], types: list[ActorType], aux_data: dict):
+        return LevelSerializer.dumps(LevelSerializer.serialize_data(actors, types, aux_data))
+
+    @staticmethod
+    def compile(raw_data: str):
+        data = json.loads(raw_data)
 
         actors = data["actors"]
         del data["actors"]
 
+        templates: list[tuple[Actor, ActorType]] = []
         for actor_data in actors:
-            position = Point.deserialize(actor_data["pos"])
-            size = Point.deserialize(actor_data["size"])
-
             type_name: str = actor_data["type"]
             config = None
             if "," in type_name:
@@ -55,8 +61,19 @@ class LevelSerializer:
             if config is not None and isinstance(actor, ConfigurableObject):
                 actor.apply_config(config)
 
-            actor.position = position
-            actor.size = size
+            actor.position = Point.deserialize(actor_data["pos"])
+            actor.size = Point.deserialize(actor_data["size"])
+
+            templates.append((actor, type))
+
+        return CompiledLevel(tuple(templates), data)
+
+    @staticmethod
+    def instantiate(world: "World", level: CompiledLevel, spawn_callback: Callable[[Actor, ActorType], Literal[False] | None] | None = None):
+        for template, type in level.actors:
+            # Same as copy(template), without going through the generic reduce protocol
+            actor = object.__new__(template.__class__)
+            actor.__dict__.update(template.__dict__)
 
             if spawn_callback is not None:
                 if spawn_callback(actor, type) == False:
@@ -64,4 +81,8 @@ class LevelSerializer:
 
             world.add_actor(actor)
 
-        return data
+        return copy(level.aux_data)
+
+    @staticmethod
+    def deserialize(world: "World", raw_data: str, spawn_callback: Callable[[Actor, ActorType], Literal[False] | None] | None = None):
+        return LevelSerializer.instantiate(world, LevelSerializer.compile(raw_data), spawn_callback)
@@ -8,7 +8,7 @@ import pygame
 
 from ..actors.Player import Player
 from ..actors.support.GuiRenderer import GuiRenderer
-from ..game_core.Camera import CameraClient
+from ..game_core.CameraClient import CameraClient
 from ..game_core.InputClient import InputClient
 from ..game_core.ResourceClient import ResourceClient
 from ..generation.RoomInfo import RoomInfo
@@ -39,12 +39,12 @@ class TestPlayController(InputClient, GuiRenderer, ResourceClient, CameraClient)
                 self.universe.set_world(play_world)
 
                 if TestPlayController.use_info:
-                    RoomPrefabRegistry.load()
+                    RoomPrefabRegistry.reload()
                     del TestPlayController.room_info.persistent_flags[:]
                     TestPlayController.room_info.seed = random()
                     self.room_prefab.instantiate_root(TestPlayController.room_info, None, play_world)
                 else:
-                    LevelSerializer.deserialize(play_world, self.room_prefab.data)
+                    LevelSerializer.deserialize(play_world, self.room_prefab.get_data())
 
                 player = Player()
                 player.position = self.spawn_position
@@ -52,7 +52,7 @@ class TestPlayController(InputClient, GuiRenderer, ResourceClient, CameraClient)
                 play_world.add_actor(self)
             except Exception:
                 if self.world is None:  # type: ignore
-                    LevelSerializer.deserialize(play_world, self.room_prefab.data)
+                    LevelSerializer.deserialize(play_world, self.room_prefab.get_data())
                     player = Player()
                     player.position = self.spawn_position
                     play_world.add_actor(player)
@@ -0,0 +1,23 @@
+import struct
+from typing import Sequence
+
+_MASK = (1 << 64) - 1
+
+
+class SplitMix:
+    # Small deterministic generator (SplitMix64), much cheaper to create than random.Random which seeds a full Mersenne Twister state
+    def __init__(self, seed: float):
+        (self._state,) = struct.unpack("<Q", struct.pack("<d", seed))
+
+    def next(self):
+        self._state = (self._state + 0x9E3779B97F4A7C15) & _MASK
+        value = self._state
+        value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+        value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK
+        return value ^ (value >> 31)
+
+    def random(self):
+        return (self.next() >> 11) * (1.0 / (1 << 53))
+
+    def choice[T](self, sequence: Sequence[T]) -> T:
+        return sequence[self.next() % len(sequence)]
@@ -0,0 +1,113 @@
+import sys
+from contextlib import contextmanager
+from importlib.abc import MetaPathFinder
+from importlib.machinery import ModuleSpec
+from time import perf_counter
+from types import ModuleType
+from typing import Any, Callable
+
+_REPORTED_MODULES = 25
+
+
+class _ImportTimer(MetaPathFinder):
+    def find_spec(self, fullname: str, path: Any, target: ModuleType | None = None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+
+            spec: ModuleSpec | None = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+
+            # Built-in and frozen importers use the class itself as the loader, patching it would affect every module
+            loader = spec.loader
+            if loader is not None and not isinstance(loader, type) and hasattr(loader, "exec_module"):
+                loader.exec_module = self._wrap(fullname, loader.exec_module)  # type: ignore
+
+            return spec
+
+        return None
+
+    def _wrap(self, name: str, exec_module: Callable[[ModuleType], None]):
+        def timed_exec_module(module: ModuleType):
+            # Time spent importing nested modules is subtracted from the parent to get its self time
+            self._stack.append(0.0)
+            start = perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                total = perf_counter() - start
+                nested = self._stack.pop()
+                if len(self._stack) > 0:
+                    self._stack[-1] += total
+                self.modules.append((name, total - nested, total))
+
+        return timed_exec_module
+
+    def __init__(self):
+        self._stack: list[float] = []
+        self.modules: list[tuple[str, float, float]] = []
+        pass
+
+
+class StartupProfiler:
+    _start: float | None = None
+    _import_timer: _ImportTimer | None = None
+    _phases: list[tuple[str, float]] = []
+    _reported = False
+
+    @staticmethod
+    def enable():
+        if StartupProfiler._start is not None:
+            return
+
+        StartupProfiler._start = perf_counter()
+        StartupProfiler._import_timer = _ImportTimer()
+        sys.meta_path.insert(0, StartupProfiler._import_timer)
+
+    @staticmethod
+    def enable_from_arguments():
+        if "--profile-startup" in sys.argv:
+            sys.argv.remove("--profile-startup")
+            StartupProfiler.enable()
+
+    @staticmethod
+    def is_enabled():
+        return StartupProfiler._start is not None and not StartupProfiler._reported
+
+    @staticmethod
+    @contextmanager
+    def phase(name: str):
+        if not StartupProfiler.is_enabled():
+            yield
+            return
+
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            StartupProfiler._phases.append((name, perf_counter() - start))
+
+    @staticmethod
+    def report():
+        if not StartupProfiler.is_enabled():
+            return
+
+        assert StartupProfiler._start is not None
+        assert StartupProfiler._import_timer is not None
+        total = perf_counter() - StartupProfiler._start
+        StartupProfiler._reported = True
+        sys.meta_path.remove(StartupProfiler._import_timer)
+
+        modules = StartupProfiler._import_timer.modules
+        import_total = sum(self_time for _, self_time, _ in modules)
+
+        print(f"Startup took {total * 1000:.2f} ms, {len(modules)} modules imported in {import_total * 1000:.2f} ms")
+
+        print("Phases:")
+        for name, duration in StartupProfiler._phases:
+            print(f"  {duration * 1000:9.2f} ms  {name}")
+
+        print("Slowest imports (self / cumulative):")
+        for name, self_time, cumulative in sorted(modules, key=lambda x: x[1], reverse=True)[:_REPORTED_MODULES]:
+            print(f"  {self_time * 1000:9.2f} ms {cumulative * 1000:9.2f} ms  {name}")
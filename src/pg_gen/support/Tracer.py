@@ -0,0 +1,186 @@
+import json
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from math import inf, isfinite
+from pathlib import Path
+from time import perf_counter
+from typing import Any, override
+
+_COUNTER_INTERVAL = 1e-3
+
+
+@dataclass
+class TraceSpan:
+    name: str
+    category: str
+    start: float
+    duration: float
+    args: dict[str, Any]
+    process_id: int
+    thread_id: int
+
+
+class TraceListener:
+    def on_span(self, span: TraceSpan): ...
+    def on_counter(self, name: str, value: int, time: float): ...
+
+
+class Tracer:
+    _listeners: list[TraceListener] = []
+
+    @staticmethod
+    def add_listener[T: TraceListener](listener: T) -> T:
+        Tracer._listeners.append(listener)
+        return listener
+
+    @staticmethod
+    def remove_listener(listener: TraceListener):
+        Tracer._listeners.remove(listener)
+
+    @staticmethod
+    def is_enabled():
+        return len(Tracer._listeners) > 0
+
+    @staticmethod
+    @contextmanager
+    def span(name: str, category: str, **args: Any):
+        # The args are yielded so results known only at the end of the span, like fitness, can be added to it
+        if not Tracer.is_enabled():
+            yield args
+            return
+
+        start = perf_counter()
+        try:
+            yield args
+        finally:
+            span = TraceSpan(name, category, start, perf_counter() - start, args, os.getpid(), threading.get_ident())
+            for listener in Tracer._listeners:
+                listener.on_span(span)
+
+    @staticmethod
+    def count(name: str, value: int = 1):
+        if not Tracer.is_enabled():
+            return
+
+        time = perf_counter()
+        for listener in Tracer._listeners:
+            listener.on_counter(name, value, time)
+
+    @staticmethod
+    def enable_from_arguments():
+        # Returns the exporters, so the caller can save them once the traced code finishes
+        if "--trace" not in sys.argv:
+            return None
+
+        index = sys.argv.index("--trace")
+        if index + 1 >= len(sys.argv):
+            raise ValueError("Expected a path after --trace")
+
+        path = Path(sys.argv[index + 1])
+        del sys.argv[index : index + 2]
+
+        chrome_trace = Tracer.add_listener(ChromeTraceExporter())
+        summary = Tracer.add_listener(TraceSummary())
+        return path, chrome_trace, summary
+
+
+class ChromeTraceExporter(TraceListener):
+    # Produces the Trace Event Format read by chrome://tracing and Perfetto
+    @override
+    def on_span(self, span: TraceSpan):
+        self.events.append(
+            {
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": (span.start - self._origin) * 1_000_000,
+                "dur": span.duration * 1_000_000,
+                "pid": span.process_id,
+                "tid": span.thread_id,
+                "args": {key: _to_json_value(value) for key, value in span.args.items()},
+            }
+        )
+
+    @override
+    def on_counter(self, name: str, value: int, time: float):
+        # Trace viewers show counter values as they are, so report the running total. Some counters
+        # are incremented thousands of times per run, so only one sample per interval is recorded.
+        total = self._counters.get(name, 0) + value
+        self._counters[name] = total
+        if time - self._counter_times.get(name, -inf) >= _COUNTER_INTERVAL:
+            self._counter_times[name] = time
+            self.events.append(self._get_counter_event(name, total, time))
+
+    def _get_counter_event(self, name: str, total: int, time: float):
+        return {"name": name, "ph": "C", "ts": (time - self._origin) * 1_000_000, "pid": os.getpid(), "args": {name: total}}
+
+    def save(self, path: Path):
+        time = perf_counter()
+        final_samples = [self._get_counter_event(name, total, time) for name, total in self._counters.items()]
+        path.write_text(json.dumps({"traceEvents": self.events + final_samples, "displayTimeUnit": "ms"}, allow_nan=False))
+
+    def __init__(self):
+        self._origin = perf_counter()
+        self._counters: dict[str, int] = {}
+        self._counter_times: dict[str, float] = {}
+        self.events: list[dict[str, Any]] = []
+        pass
+
+
+@dataclass
+class SpanStatistics:
+    count: int = 0
+    total_time: float = 0
+    max_time: float = 0
+
+    def add(self, duration: float):
+        self.count += 1
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+
+
+@dataclass
+class TraceSummary(TraceListener):
+    spans: dict[str, SpanStatistics] = field(default_factory=lambda: {})
+    counters: dict[str, int] = field(default_factory=lambda: {})
+
+    @override
+    def on_span(self, span: TraceSpan):
+        self.spans.setdefault(f"{span.category}/{span.name}", SpanStatistics()).add(span.duration)
+
+    @override
+    def on_counter(self, name: str, value: int, time: float):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def serialize(self):
+        return {
+            "spans": {
+                name: {"count": statistics.count, "total_ms": statistics.total_time * 1000, "max_ms": statistics.max_time * 1000}
+                for name, statistics in self.spans.items()
+            },
+            "counters": self.counters,
+        }
+
+    def save(self, path: Path):
+        path.write_text(json.dumps(self.serialize(), indent=4, allow_nan=False) + "\n")
+
+    def print_summary(self):
+        print(f"{"span":<36} {"count":>8} {"total ms":>10} {"mean ms":>10} {"max ms":>10}")
+        for name, statistics in sorted(self.spans.items(), key=lambda x: x[1].total_time, reverse=True):
+            mean = statistics.total_time / statistics.count
+            print(f"{name:<36} {statistics.count:>8} {statistics.total_time * 1000:>10.2f} {mean * 1000:>10.2f} {statistics.max_time * 1000:>10.2f}")
+
+        for name, value in sorted(self.counters.items()):
+            print(f"{name:<36} {value:>8}")
+
+
+def _to_json_value(value: Any):
+    # JSON has no infinity or NaN, but a candidate matching its target exactly has infinite fitness, so they are kept as strings
+    if isinstance(value, float) and not isfinite(value):
+        return str(value)
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
@@ -2,6 +2,7 @@ from typing import TYPE_CHECKING, Iterable
 
 from ..support.Point import Point
 from ..support.resolve_intersection import is_intersection, resolve_intersection
+from ..support.support import find_index_by_predicate
 from .CollisionFlags import CollisionFlags
 from .SpriteLayer import SpriteLayer
 
@@ -48,18 +49,20 @@ class World:
             self.add_actor(actor)
 
     def remove_actor(self, actor: "Actor"):
-        if not actor in self._actors:
+        # Actor subclasses are dataclasses that compare by value, so look for this exact instance
+        index = find_index_by_predicate(self._actors, lambda v: v is actor)
+        if index == -1:
             return
 
         actor.world = None  # type: ignore
 
-        self._actors.pop(self._actors.index(actor))
+        self._actors.pop(index)
 
         if CollisionFlags.STATIC in actor.collision_flags:
-            self._colliders.pop(self._colliders.index(actor))
+            self._colliders.pop(find_index_by_predicate(self._colliders, lambda v: v is actor))
 
         if CollisionFlags.TRIGGER in actor.collision_flags:
-            self._triggers.pop(self._triggers.index(actor))
+            self._triggers.pop(find_index_by_predicate(self._triggers, lambda v: v is actor))
 
         if self.active:
             actor.on_removed()